@@ -9,7 +9,21 @@ Autor: LABFICOL/UFSC
 """
 
 import csv
-from datetime import datetime
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from datetime import date, datetime
+
+try:
+    import numpy as np
+except ImportError:  # opcional: sem NumPy, agrupar() percorre as linhas uma a uma
+    np = None
 
 def criar_arquivo_exemplo():
     """Cria um arquivo CSV de exemplo com dados de coleta"""
@@ -67,125 +81,781 @@ def carregar_dados(nome_arquivo='coletas.csv'):
         print(f"❌ Erro ao carregar arquivo: {e}")
         return []
 
+# ----------------------------------------------------------------------
+# Carregamento em colunas
+#
+# Um dicionário por linha custa centenas de bytes por coleta. Para
+# campanhas com milhões de linhas, a TabelaColetas guarda cada campo em um
+# array.array tipado e troca os textos de praia/espécie por códigos
+# inteiros (codificação por dicionário): cerca de 50 bytes por coleta.
+# ----------------------------------------------------------------------
+
+COLUNAS_NUMERICAS = ['biomassa_g', 'temperatura_c', 'salinidade_psu', 'profundidade_m']
+COLUNAS_CATEGORICAS = ['praia', 'especie']
+
+
+def converter_data(texto):
+    """'15/01/2025' -> número do dia (date.toordinal), cabe num inteiro"""
+    dia, mes, ano = texto.split('/')
+    return date(int(ano), int(mes), int(dia)).toordinal()
+
+
+def formatar_data(ordinal):
+    """Inverso de converter_data()"""
+    return date.fromordinal(ordinal).strftime('%d/%m/%Y')
+
+
+class LinhaColeta(Mapping):
+    """Uma linha da TabelaColetas, com a mesma cara do dicionário de carregar_dados()"""
+
+    __slots__ = ('tabela', 'indice')
+
+    def __init__(self, tabela, indice):
+        self.tabela = tabela
+        self.indice = indice
+
+    def __getitem__(self, campo):
+        return self.tabela.valor(campo, self.indice)
+
+    def __iter__(self):
+        return iter(TabelaColetas.CAMPOS)
+
+    def __len__(self):
+        return len(TabelaColetas.CAMPOS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class TabelaColetas:
+    """Coletas guardadas por coluna, com tipos fixos.
+
+    Percorrer a tabela (ou indexá-la) devolve objetos LinhaColeta, então as
+    funções de análise abaixo funcionam com ela sem mudanças.
+    """
+
+    CAMPOS = ('id', 'data', *COLUNAS_CATEGORICAS, *COLUNAS_NUMERICAS)
+
+    def __init__(self):
+        self.colunas = {
+            'id': array('q'),
+            'data': array('l'),       # dias (date.toordinal)
+            'praia': array('I'),      # posição em self.categorias['praia']
+            'especie': array('I'),    # posição em self.categorias['especie']
+        }
+        for nome in COLUNAS_NUMERICAS:
+            self.colunas[nome] = array('d')
+        # código -> texto e texto -> código de cada coluna categórica
+        self.categorias = {nome: [] for nome in COLUNAS_CATEGORICAS}
+        self.codigos = {nome: {} for nome in COLUNAS_CATEGORICAS}
+        self._indice = None
+
+    def codificar(self, coluna, texto):
+        """Código inteiro do texto na coluna, criando-o se for novo"""
+        codigos = self.codigos[coluna]
+        codigo = codigos.get(texto)
+        if codigo is None:
+            codigo = codigos[texto] = len(self.categorias[coluna])
+            self.categorias[coluna].append(texto)
+        return codigo
+
+    def valor(self, campo, indice):
+        valor = self.colunas[campo][indice]
+        if campo in self.categorias:
+            return self.categorias[campo][valor]
+        if campo == 'data':
+            return formatar_data(valor)
+        return valor
+
+    def indice(self):
+        """IndiceColetas da tabela, montado na primeira consulta.
+
+        A tabela só muda quando carregar_tabela() acrescenta linhas, então o
+        índice é reaproveitado enquanto o número de linhas for o mesmo.
+        """
+        if self._indice is None or self._indice.tamanho != len(self):
+            self._indice = IndiceColetas(self)
+        return self._indice
+
+    def bytes_por_linha(self):
+        return sum(coluna.itemsize for coluna in self.colunas.values())
+
+    def __len__(self):
+        return len(self.colunas['id'])
+
+    def __getitem__(self, indice):
+        if not -len(self) <= indice < len(self):
+            raise IndexError(indice)
+        return LinhaColeta(self, indice % len(self))
+
+    def __iter__(self):
+        for indice in range(len(self)):
+            yield LinhaColeta(self, indice)
+
+
+# ----------------------------------------------------------------------
+# Cache binário
+#
+# Depois de ler o CSV, carregar_tabela() grava ao lado dele um arquivo
+# '<csv>.cache': um cabeçalho JSON (tamanho e data de modificação do CSV,
+# categorias, posição de cada coluna) seguido dos bytes crus de cada
+# array. Nas próximas execuções o cache é mapeado na memória (mmap) e as
+# colunas viram memoryviews, sem converter texto nenhum. Se o CSV mudou,
+# o cache é ignorado e regravado.
+# ----------------------------------------------------------------------
+
+CACHE_MAGICO = b'COLETAS\x00'
+CACHE_VERSAO = 1
+
+
+def caminho_cache(nome_arquivo):
+    return nome_arquivo + '.cache'
+
+
+def _alinhar(posicao, bloco=8):
+    return -(-posicao // bloco) * bloco
+
+
+def _assinatura(nome_arquivo, conferir_conteudo=False):
+    """Tamanho e data de modificação do CSV (e o SHA-256, se pedido)"""
+    info = os.stat(nome_arquivo)
+    assinatura = {'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns}
+    if conferir_conteudo:
+        resumo = hashlib.sha256()
+        with open(nome_arquivo, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+                resumo.update(bloco)
+        assinatura['sha256'] = resumo.hexdigest()
+    return assinatura
+
+
+def salvar_cache(tabela, nome_arquivo, assinatura):
+    """Grava a tabela em '<csv>.cache' (arquivo temporário + os.replace)"""
+    colunas, inicio = [], 0
+    for nome, coluna in tabela.colunas.items():
+        tamanho = len(coluna) * coluna.itemsize
+        colunas.append({'nome': nome, 'tipo': coluna.typecode, 'itemsize': coluna.itemsize,
+                        'inicio': inicio, 'bytes': tamanho})
+        inicio = _alinhar(inicio + tamanho)
+    cabecalho = json.dumps({
+        'versao': CACHE_VERSAO,
+        'ordem_bytes': sys.byteorder,
+        'csv': assinatura,
+        'linhas': len(tabela),
+        'categorias': tabela.categorias,
+        'colunas': colunas,
+    }, ensure_ascii=False).encode('utf-8')
+    
+    destino = caminho_cache(nome_arquivo)
+    temporario = destino + '.tmp'
+    with open(temporario, 'wb') as arquivo:
+        arquivo.write(CACHE_MAGICO)
+        arquivo.write(struct.pack('<I', len(cabecalho)))
+        arquivo.write(cabecalho)
+        base = _alinhar(arquivo.tell())
+        for descricao, coluna in zip(colunas, tabela.colunas.values()):
+            arquivo.write(b'\x00' * (base + descricao['inicio'] - arquivo.tell()))
+            arquivo.write(coluna.tobytes())
+    os.replace(temporario, destino)
+
+
+def carregar_cache(nome_arquivo, conferir_conteudo=False):
+    """TabelaColetas mapeada de '<csv>.cache', ou None se não houver cache
+    válido para o CSV atual. As colunas são memoryviews somente leitura."""
+    try:
+        with open(caminho_cache(nome_arquivo), 'rb') as arquivo:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapa[:len(CACHE_MAGICO)] != CACHE_MAGICO:
+            return None
+        inicio = len(CACHE_MAGICO) + 4
+        tamanho, = struct.unpack_from('<I', mapa, len(CACHE_MAGICO))
+        cabecalho = json.loads(mapa[inicio:inicio + tamanho].decode('utf-8'))
+        if cabecalho['versao'] != CACHE_VERSAO or cabecalho['ordem_bytes'] != sys.byteorder:
+            return None
+        
+        esperado = cabecalho['csv']
+        atual = _assinatura(nome_arquivo)
+        if (esperado['tamanho'], esperado['mtime_ns']) != (atual['tamanho'], atual['mtime_ns']):
+            return None
+        if conferir_conteudo and esperado.get('sha256') != _assinatura(nome_arquivo, True)['sha256']:
+            return None
+        
+        base = _alinhar(inicio + tamanho)
+        dados = memoryview(mapa)
+        tabela = TabelaColetas()
+        for coluna in cabecalho['colunas']:
+            # 'l' tem 4 bytes no Windows e 8 no Linux: cache de outra máquina
+            if array(coluna['tipo']).itemsize != coluna['itemsize']:
+                return None
+            posicao = base + coluna['inicio']
+            tabela.colunas[coluna['nome']] = dados[posicao:posicao + coluna['bytes']].cast(coluna['tipo'])
+        tabela.categorias = cabecalho['categorias']
+        tabela.codigos = {nome: {texto: codigo for codigo, texto in enumerate(textos)}
+                          for nome, textos in tabela.categorias.items()}
+        return tabela
+    except (OSError, ValueError, KeyError, struct.error):
+        # sem cache, CSV inexistente ou cache corrompido: lê o CSV
+        return None
+
+
+def carregar_tabela(nome_arquivo='coletas.csv', usar_cache=True, conferir_conteudo=False):
+    """Carrega o CSV direto em colunas tipadas (ver TabelaColetas).
+
+    Com usar_cache, reaproveita '<csv>.cache' enquanto o CSV não mudar de
+    tamanho nem de data; conferir_conteudo também compara o SHA-256.
+    """
+    if usar_cache:
+        tabela = carregar_cache(nome_arquivo, conferir_conteudo)
+        if tabela is not None:
+            print(f"⚡ {len(tabela)} coletas lidas do cache '{caminho_cache(nome_arquivo)}'")
+            return tabela
+    
+    tabela = TabelaColetas()
+    
+    try:
+        assinatura = _assinatura(nome_arquivo, conferir_conteudo)
+        with open(nome_arquivo, 'r', encoding='utf-8', newline='') as arquivo:
+            leitor = csv.reader(arquivo)
+            cabecalho = next(leitor)
+            posicao = {campo: cabecalho.index(campo) for campo in TabelaColetas.CAMPOS}
+            # poucas datas distintas por campanha: converte cada uma só uma vez
+            datas = {}
+            
+            for campos in leitor:
+                if not campos:
+                    continue
+                texto_data = campos[posicao['data']]
+                if texto_data not in datas:
+                    datas[texto_data] = converter_data(texto_data)
+                tabela.colunas['id'].append(int(campos[posicao['id']]))
+                tabela.colunas['data'].append(datas[texto_data])
+                for nome in COLUNAS_CATEGORICAS:
+                    tabela.colunas[nome].append(tabela.codificar(nome, campos[posicao[nome]]))
+                for nome in COLUNAS_NUMERICAS:
+                    tabela.colunas[nome].append(float(campos[posicao[nome]]))
+        
+        print(f"✅ {len(tabela)} coletas carregadas de '{nome_arquivo}' "
+              f"({tabela.bytes_por_linha()} bytes por coleta)")
+        if usar_cache:
+            try:
+                salvar_cache(tabela, nome_arquivo, assinatura)
+            except OSError as e:
+                print(f"⚠️  Cache não gravado: {e}")
+        return tabela
+    
+    except FileNotFoundError:
+        print(f"❌ Arquivo '{nome_arquivo}' não encontrado!")
+        print("💡 Criando arquivo de exemplo...")
+        criar_arquivo_exemplo()
+        return carregar_tabela(nome_arquivo, usar_cache, conferir_conteudo)
+    except Exception as e:
+        print(f"❌ Erro ao carregar arquivo: {e}")
+        return TabelaColetas()
+
+def ler_coletas(nome_arquivo='coletas.csv'):
+    """Lê o CSV linha a linha, sem carregar tudo na memória.
+
+    Serve para arquivos maiores que a RAM: agregar(ler_coletas('campanha.csv'))
+    percorre o arquivo uma única vez.
+    """
+    with open(nome_arquivo, 'r', encoding='utf-8', newline='') as arquivo:
+        for linha in csv.DictReader(arquivo):
+            yield {
+                'id': int(linha['id']),
+                'data': linha['data'],
+                'praia': linha['praia'],
+                'especie': linha['especie'],
+                **{nome: float(linha[nome]) for nome in COLUNAS_NUMERICAS},
+            }
+
+class Estatistica:
+    """Contagem, soma, mínimo, máximo, média e variância de uma métrica,
+    atualizadas a cada valor (algoritmo de Welford), sem guardar os valores"""
+
+    __slots__ = ('n', 'soma', 'minimo', 'maximo', '_media', '_m2')
+
+    def __init__(self):
+        self.n = 0
+        self.soma = 0.0
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+        self._media = 0.0
+        self._m2 = 0.0
+
+    def adicionar(self, valor):
+        self.n += 1
+        self.soma += valor
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+        delta = valor - self._media
+        self._media += delta / self.n
+        self._m2 += delta * (valor - self._media)
+
+    @classmethod
+    def de_resumo(cls, n, soma, minimo, maximo, m2):
+        """Estatistica já calculada por outro caminho (ex.: NumPy)"""
+        estatistica = cls()
+        estatistica.n = n
+        estatistica.soma = soma
+        estatistica.minimo = minimo
+        estatistica.maximo = maximo
+        estatistica._media = soma / n
+        estatistica._m2 = m2
+        return estatistica
+
+    @property
+    def media(self):
+        return self.soma / self.n
+
+    @property
+    def variancia(self):
+        """Variância amostral (n - 1)"""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desvio_padrao(self):
+        return self.variancia ** 0.5
+
+
+def _estatisticas():
+    return {nome: Estatistica() for nome in COLUNAS_NUMERICAS}
+
+
+class AgregadorColetas:
+    """Estatísticas gerais, por espécie e por praia, calculadas numa só passada.
+
+    Memória constante em relação ao número de coletas: só guarda uma
+    Estatistica por métrica e por grupo.
+    """
+
+    def __init__(self):
+        self.geral = _estatisticas()
+        self.por_especie = {}
+        self.por_praia = {}
+        # praias de cada espécie e espécies de cada praia (dicionários usados
+        # como conjuntos ordenados, na ordem em que aparecem)
+        self.praias_da_especie = {}
+        self.especies_da_praia = {}
+
+    def adicionar(self, coleta):
+        especie = coleta['especie']
+        praia = coleta['praia']
+        grupo_especie = self.por_especie.get(especie)
+        if grupo_especie is None:
+            grupo_especie = self.por_especie[especie] = _estatisticas()
+            self.praias_da_especie[especie] = {}
+        grupo_praia = self.por_praia.get(praia)
+        if grupo_praia is None:
+            grupo_praia = self.por_praia[praia] = _estatisticas()
+            self.especies_da_praia[praia] = {}
+        self.praias_da_especie[especie][praia] = None
+        self.especies_da_praia[praia][especie] = None
+        for nome in COLUNAS_NUMERICAS:
+            valor = coleta[nome]
+            self.geral[nome].adicionar(valor)
+            grupo_especie[nome].adicionar(valor)
+            grupo_praia[nome].adicionar(valor)
+
+    def __len__(self):
+        return self.geral['biomassa_g'].n
+
+
+def agregar(coletas):
+    """Percorre as coletas (lista, TabelaColetas ou ler_coletas()) uma vez"""
+    agregado = AgregadorColetas()
+    if np is not None and isinstance(coletas, TabelaColetas):
+        # com NumPy, os mesmos grupos saem das colunas, sem laço por linha
+        agregado.geral = agrupar(coletas, ()).get((), agregado.geral)
+        agregado.por_especie = {chave[0]: grupo for chave, grupo in agrupar(coletas, ('especie',)).items()}
+        agregado.por_praia = {chave[0]: grupo for chave, grupo in agrupar(coletas, ('praia',)).items()}
+        for especie, praia in agrupar(coletas, ('especie', 'praia'), metricas=()):
+            agregado.praias_da_especie.setdefault(especie, {})[praia] = None
+            agregado.especies_da_praia.setdefault(praia, {})[especie] = None
+        return agregado
+    for coleta in coletas:
+        agregado.adicionar(coleta)
+    return agregado
+
+
+# ----------------------------------------------------------------------
+# Agrupamento por chaves arbitrárias (ex.: espécie × praia × mês)
+# ----------------------------------------------------------------------
+
+# como obter cada chave de uma linha (dicionário ou LinhaColeta)
+CHAVES = {
+    'especie': lambda coleta: coleta['especie'],
+    'praia': lambda coleta: coleta['praia'],
+    'mes': lambda coleta: int(coleta['data'].split('/')[1]),
+    'ano': lambda coleta: int(coleta['data'].split('/')[2]),
+}
+
+
+def agrupar(coletas, chaves=('especie',), metricas=COLUNAS_NUMERICAS):
+    """Estatísticas de cada métrica para cada combinação de chaves.
+
+    Devolve {(valor_chave1, valor_chave2, ...): {metrica: Estatistica}}.
+    Com NumPy e uma TabelaColetas o cálculo é vetorizado; nos outros casos,
+    uma passada linha a linha com Estatistica.
+    """
+    for chave in chaves:
+        if chave not in CHAVES:
+            raise ValueError(f"Chave desconhecida: {chave} (use {', '.join(CHAVES)})")
+    if np is not None and isinstance(coletas, TabelaColetas):
+        return _agrupar_colunas(coletas, chaves, metricas)
+    return _agrupar_linhas(coletas, chaves, metricas)
+
+
+def _agrupar_linhas(coletas, chaves, metricas):
+    extratores = [CHAVES[chave] for chave in chaves]
+    grupos = {}
+    for coleta in coletas:
+        chave = tuple(extrair(coleta) for extrair in extratores)
+        grupo = grupos.get(chave)
+        if grupo is None:
+            grupo = grupos[chave] = {nome: Estatistica() for nome in metricas}
+        for nome in metricas:
+            grupo[nome].adicionar(coleta[nome])
+    return grupos
+
+
+def _coluna(tabela, nome):
+    # visão NumPy da coluna (array.array ou memoryview do cache), sem copiar os dados
+    coluna = tabela.colunas[nome]
+    return np.frombuffer(coluna, dtype=memoryview(coluna).format)
+
+
+def _codigos(tabela, chave):
+    """(código inteiro por linha, função código -> valor da chave)"""
+    if chave in tabela.categorias:
+        return _coluna(tabela, chave), tabela.categorias[chave].__getitem__
+    dias = _coluna(tabela, 'data') - 1
+    # meses desde janeiro de 1970
+    meses = (np.datetime64('0001-01-01') + dias.astype('timedelta64[D]')).astype('datetime64[M]').astype(np.int64)
+    if chave == 'mes':
+        return meses % 12 + 1, int
+    return meses // 12 + 1970, int
+
+
+def _agrupar_colunas(tabela, chaves, metricas):
+    """Fatoriza as chaves com np.unique e reduz cada métrica por grupo com
+    bincount e ufunc.reduceat. Os grupos saem na ordem em que aparecem pela
+    primeira vez, como em _agrupar_linhas, para a saída não depender do NumPy."""
+    if len(tabela) == 0:
+        return {}
+    codigos = [_codigos(tabela, chave) for chave in chaves]
+    # junta os códigos de todas as chaves num único inteiro por linha
+    # (base mista), o que deixa o np.unique unidimensional e rápido
+    combinado = np.zeros(len(tabela), dtype=np.int64)
+    bases = []
+    for codigo, _ in codigos:
+        menor = int(codigo.min())
+        tamanho = int(codigo.max()) - menor + 1
+        combinado = combinado * tamanho + (codigo - menor)
+        bases.append((menor, tamanho))
+    unicos, primeira, grupo = np.unique(combinado, return_index=True, return_inverse=True)
+    total = len(unicos)
+    # renumera os grupos pela linha em que cada um aparece primeiro
+    por_aparicao = np.argsort(primeira, kind='stable')
+    novo_numero = np.empty(total, dtype=np.int64)
+    novo_numero[por_aparicao] = np.arange(total)
+    unicos, grupo = unicos[por_aparicao], novo_numero[grupo]
+    colunas = []
+    for menor, tamanho in reversed(bases):
+        colunas.append(unicos % tamanho + menor)
+        unicos = unicos // tamanho
+    combinacoes = zip(*[coluna.tolist() for coluna in reversed(colunas)]) if colunas else [()]
+    contagem = np.bincount(grupo, minlength=total)
+    # linhas ordenadas por grupo: cada grupo vira uma fatia contígua
+    ordem = np.argsort(grupo, kind='stable')
+    inicios = np.concatenate(([0], np.cumsum(contagem)[:-1]))
+
+    resumos = {}
+    for nome in metricas:
+        valores = _coluna(tabela, nome)
+        soma = np.bincount(grupo, weights=valores, minlength=total)
+        desvios = valores - (soma / contagem)[grupo]
+        m2 = np.bincount(grupo, weights=desvios * desvios, minlength=total)
+        ordenados = valores[ordem]
+        resumos[nome] = (soma.tolist(), np.minimum.reduceat(ordenados, inicios).tolist(),
+                         np.maximum.reduceat(ordenados, inicios).tolist(), m2.tolist())
+
+    rotulos = [rotulo for _, rotulo in codigos]
+    grupos = {}
+    for indice, combinacao in enumerate(combinacoes):
+        chave = tuple(rotulo(codigo) for rotulo, codigo in zip(rotulos, combinacao))
+        grupos[chave] = {
+            nome: Estatistica.de_resumo(int(contagem[indice]), soma[indice], minimo[indice],
+                                        maximo[indice], m2[indice])
+            for nome, (soma, minimo, maximo, m2) in resumos.items()
+        }
+    return grupos
+
+
+def tabela_cruzada(coletas, chaves=('especie', 'praia', 'mes'), metrica='biomassa_g'):
+    """Mostra a média de uma métrica para cada combinação das chaves"""
+    if not coletas:
+        return
+    grupos = agrupar(coletas, chaves, metricas=(metrica,))
+    
+    print("\n" + "="*70)
+    print(f"📅 {metrica.upper()} POR {' × '.join(chave.upper() for chave in chaves)}")
+    print("="*70)
+    
+    for chave in sorted(grupos):
+        estatistica = grupos[chave][metrica]
+        rotulo = ' | '.join(str(valor) for valor in chave)
+        print(f"   {rotulo:<40} n={estatistica.n:<5} média={estatistica.media:.2f}")
+
+
+def _agregado(coletas):
+    # as análises aceitam as coletas ou um agregado já calculado
+    return coletas if isinstance(coletas, AgregadorColetas) else agregar(coletas)
+
 def estatisticas_basicas(coletas):
     """Calcula estatísticas básicas dos dados"""
     if not coletas:
         print("⚠️ Nenhum dado para analisar.")
         return
+    geral = _agregado(coletas).geral
     
     print("\n" + "="*70)
     print("📊 ESTATÍSTICAS BÁSICAS")
     print("="*70)
     
     # Biomassa
-    biomassas = [c['biomassa_g'] for c in coletas]
+    biomassa = geral['biomassa_g']
     print(f"\n⚖️  BIOMASSA:")
-    print(f"   Média: {sum(biomassas) / len(biomassas):.2f}g")
-    print(f"   Mínima: {min(biomassas):.2f}g")
-    print(f"   Máxima: {max(biomassas):.2f}g")
-    print(f"   Total: {sum(biomassas):.2f}g")
+    print(f"   Média: {biomassa.media:.2f}g")
+    print(f"   Mínima: {biomassa.minimo:.2f}g")
+    print(f"   Máxima: {biomassa.maximo:.2f}g")
+    print(f"   Desvio padrão: {biomassa.desvio_padrao:.2f}g")
+    print(f"   Total: {biomassa.soma:.2f}g")
     
     # Temperatura
-    temperaturas = [c['temperatura_c'] for c in coletas]
+    temperatura = geral['temperatura_c']
     print(f"\n🌡️  TEMPERATURA:")
-    print(f"   Média: {sum(temperaturas) / len(temperaturas):.2f}°C")
-    print(f"   Mínima: {min(temperaturas):.2f}°C")
-    print(f"   Máxima: {max(temperaturas):.2f}°C")
+    print(f"   Média: {temperatura.media:.2f}°C")
+    print(f"   Mínima: {temperatura.minimo:.2f}°C")
+    print(f"   Máxima: {temperatura.maximo:.2f}°C")
+    print(f"   Desvio padrão: {temperatura.desvio_padrao:.2f}°C")
     
     # Salinidade
-    salinidades = [c['salinidade_psu'] for c in coletas]
+    salinidade = geral['salinidade_psu']
     print(f"\n🧂 SALINIDADE:")
-    print(f"   Média: {sum(salinidades) / len(salinidades):.2f} PSU")
-    print(f"   Mínima: {min(salinidades):.2f} PSU")
-    print(f"   Máxima: {max(salinidades):.2f} PSU")
+    print(f"   Média: {salinidade.media:.2f} PSU")
+    print(f"   Mínima: {salinidade.minimo:.2f} PSU")
+    print(f"   Máxima: {salinidade.maximo:.2f} PSU")
+    print(f"   Desvio padrão: {salinidade.desvio_padrao:.2f} PSU")
     
     # Profundidade
-    profundidades = [c['profundidade_m'] for c in coletas]
+    profundidade = geral['profundidade_m']
     print(f"\n🌊 PROFUNDIDADE:")
-    print(f"   Média: {sum(profundidades) / len(profundidades):.2f}m")
-    print(f"   Mínima: {min(profundidades):.2f}m")
-    print(f"   Máxima: {max(profundidades):.2f}m")
+    print(f"   Média: {profundidade.media:.2f}m")
+    print(f"   Mínima: {profundidade.minimo:.2f}m")
+    print(f"   Máxima: {profundidade.maximo:.2f}m")
+    print(f"   Desvio padrão: {profundidade.desvio_padrao:.2f}m")
 
 def analise_por_especie(coletas):
     """Analisa dados agrupados por espécie"""
     if not coletas:
         return
+    agregado = _agregado(coletas)
     
     print("\n" + "="*70)
     print("🌿 ANÁLISE POR ESPÉCIE")
     print("="*70)
     
-    # Agrupar por espécie
-    especies = {}
-    for coleta in coletas:
-        especie = coleta['especie']
-        if especie not in especies:
-            especies[especie] = []
-        especies[especie].append(coleta)
-    
     # Analisar cada espécie
-    for especie, dados in especies.items():
+    for especie, dados in agregado.por_especie.items():
         print(f"\n📌 {especie}")
         print("-" * 70)
-        print(f"   Ocorrências: {len(dados)}")
-        
-        biomassas = [d['biomassa_g'] for d in dados]
-        print(f"   Biomassa média: {sum(biomassas) / len(biomassas):.2f}g")
-        
-        temperaturas = [d['temperatura_c'] for d in dados]
-        print(f"   Temperatura média: {sum(temperaturas) / len(temperaturas):.2f}°C")
-        
-        profundidades = [d['profundidade_m'] for d in dados]
-        print(f"   Profundidade média: {sum(profundidades) / len(profundidades):.2f}m")
+        print(f"   Ocorrências: {dados['biomassa_g'].n}")
+        print(f"   Biomassa média: {dados['biomassa_g'].media:.2f}g")
+        print(f"   Temperatura média: {dados['temperatura_c'].media:.2f}°C")
+        print(f"   Profundidade média: {dados['profundidade_m'].media:.2f}m")
         
         # Praias onde foi encontrada
-        praias = list(set(d['praia'] for d in dados))
+        praias = list(agregado.praias_da_especie[especie])
         print(f"   Praias: {', '.join(praias)}")
 
 def analise_por_praia(coletas):
     """Analisa dados agrupados por praia"""
     if not coletas:
         return
+    agregado = _agregado(coletas)
     
     print("\n" + "="*70)
     print("📍 ANÁLISE POR PRAIA")
     print("="*70)
     
-    # Agrupar por praia
-    praias = {}
-    for coleta in coletas:
-        praia = coleta['praia']
-        if praia not in praias:
-            praias[praia] = []
-        praias[praia].append(coleta)
-    
     # Analisar cada praia
-    for praia, dados in praias.items():
+    for praia, dados in agregado.por_praia.items():
         print(f"\n📌 {praia}")
         print("-" * 70)
-        print(f"   Coletas realizadas: {len(dados)}")
+        print(f"   Coletas realizadas: {dados['biomassa_g'].n}")
         
         # Espécies encontradas
-        especies_encontradas = list(set(d['especie'] for d in dados))
+        especies_encontradas = list(agregado.especies_da_praia[praia])
         print(f"   Espécies ({len(especies_encontradas)}): {', '.join(especies_encontradas)}")
         
-        biomassas = [d['biomassa_g'] for d in dados]
-        print(f"   Biomassa total: {sum(biomassas):.2f}g")
-        print(f"   Biomassa média: {sum(biomassas) / len(biomassas):.2f}g")
-        
-        temperaturas = [d['temperatura_c'] for d in dados]
-        print(f"   Temperatura média: {sum(temperaturas) / len(temperaturas):.2f}°C")
+        print(f"   Biomassa total: {dados['biomassa_g'].soma:.2f}g")
+        print(f"   Biomassa média: {dados['biomassa_g'].media:.2f}g")
+        print(f"   Temperatura média: {dados['temperatura_c'].media:.2f}°C")
+
+# ----------------------------------------------------------------------
+# Índices para filtros
+#
+# Em vez de percorrer todas as coletas a cada consulta, o IndiceColetas é
+# montado uma vez: um dicionário (texto em minúsculas -> linhas) para
+# espécie e praia, e cada coluna numérica ordenada, onde o bisect acha um
+# intervalo em O(log n). Critérios se combinam com & (E) e | (OU).
+#
+# A TabelaColetas guarda o próprio índice (ver TabelaColetas.indice). Listas
+# de dicionários podem ser alteradas a qualquer momento: são percorridas
+# linha a linha, a menos que se passe um IndiceColetas montado sobre elas,
+# que só vale enquanto a lista e suas linhas não mudarem.
+# ----------------------------------------------------------------------
+
+class IndiceColetas:
+    """Índices de um conjunto de coletas (lista de dicionários ou TabelaColetas).
+
+    O índice não acompanha alterações: monte outro se as coletas mudarem.
+    """
+
+    def __init__(self, coletas):
+        self.coletas = coletas if isinstance(coletas, (list, TabelaColetas)) else list(coletas)
+        self.tamanho = len(self.coletas)
+        # campo -> {texto.casefold(): posições das linhas}
+        self.textos = {campo: self._indexar_texto(campo) for campo in COLUNAS_CATEGORICAS}
+        # campo -> (valores ordenados, posição de cada valor); feito sob demanda
+        self.ordenados = {}
+
+    def _indexar_texto(self, campo):
+        indice = {}
+        if isinstance(self.coletas, TabelaColetas):
+            # basta uma passada pelos códigos inteiros da coluna
+            por_codigo = [array('I') for _ in self.coletas.categorias[campo]]
+            for posicao, codigo in enumerate(self.coletas.colunas[campo]):
+                por_codigo[codigo].append(posicao)
+            for texto, posicoes in zip(self.coletas.categorias[campo], por_codigo):
+                indice.setdefault(texto.casefold(), array('I')).extend(posicoes)
+        else:
+            for posicao, coleta in enumerate(self.coletas):
+                indice.setdefault(coleta[campo].casefold(), array('I')).append(posicao)
+        return indice
+
+    def _ordenado(self, campo):
+        if campo not in self.ordenados:
+            if isinstance(self.coletas, TabelaColetas):
+                valores = self.coletas.colunas[campo]
+            else:
+                valores = array('d', (coleta[campo] for coleta in self.coletas))
+            ordem = array('I', sorted(range(len(valores)), key=valores.__getitem__))
+            self.ordenados[campo] = (array('d', (valores[i] for i in ordem)), ordem)
+        return self.ordenados[campo]
+
+    def igual(self, campo, texto):
+        """Posições das linhas cujo campo é `texto`, sem diferenciar maiúsculas"""
+        return set(self.textos[campo].get(texto.casefold(), ()))
+
+    def entre(self, campo, minimo=None, maximo=None):
+        """Posições das linhas com minimo <= campo <= maximo (limites opcionais)"""
+        valores, ordem = self._ordenado(campo)
+        inicio = 0 if minimo is None else bisect_left(valores, minimo)
+        fim = len(valores) if maximo is None else bisect_right(valores, maximo)
+        return set(ordem[inicio:fim])
+
+    def linhas(self, posicoes):
+        """Linhas das posições, na ordem original do arquivo"""
+        return [self.coletas[posicao] for posicao in sorted(posicoes)]
+
+
+class Criterio:
+    """Base dos critérios de consulta; combine com & e |"""
+
+    def __and__(self, outro):
+        return E(self, outro)
+
+    def __or__(self, outro):
+        return Ou(self, outro)
+
+
+class Igual(Criterio):
+    def __init__(self, campo, valor):
+        self.campo = campo
+        self.valor = valor
+
+    def posicoes(self, indice):
+        return indice.igual(self.campo, self.valor)
+
+    def aceita(self, coleta):
+        return coleta[self.campo].casefold() == self.valor.casefold()
+
+
+class Entre(Criterio):
+    def __init__(self, campo, minimo=None, maximo=None):
+        self.campo = campo
+        self.minimo = minimo
+        self.maximo = maximo
+
+    def posicoes(self, indice):
+        return indice.entre(self.campo, self.minimo, self.maximo)
+
+    def aceita(self, coleta):
+        valor = coleta[self.campo]
+        return ((self.minimo is None or valor >= self.minimo)
+                and (self.maximo is None or valor <= self.maximo))
+
+
+class E(Criterio):
+    def __init__(self, *criterios):
+        self.criterios = criterios
+
+    def posicoes(self, indice):
+        # intersecta a partir do menor conjunto
+        conjuntos = sorted((c.posicoes(indice) for c in self.criterios), key=len)
+        return set.intersection(*conjuntos)
+
+    def aceita(self, coleta):
+        return all(c.aceita(coleta) for c in self.criterios)
+
+
+class Ou(Criterio):
+    def __init__(self, *criterios):
+        self.criterios = criterios
+
+    def posicoes(self, indice):
+        return set().union(*(c.posicoes(indice) for c in self.criterios))
+
+    def aceita(self, coleta):
+        return any(c.aceita(coleta) for c in self.criterios)
+
+
+def consultar(coletas, criterio):
+    """Coletas que atendem ao critério, ex.:
+    consultar(coletas, Igual('especie', 'ulva lactuca') & Entre('temperatura_c', minimo=22))
+
+    `coletas` pode ser uma TabelaColetas (usa o índice dela), um
+    IndiceColetas ou qualquer sequência/iterável de coletas (percorrido).
+    """
+    if isinstance(coletas, TabelaColetas):
+        coletas = coletas.indice()
+    if isinstance(coletas, IndiceColetas):
+        return coletas.linhas(criterio.posicoes(coletas))
+    return [coleta for coleta in coletas if criterio.aceita(coleta)]
 
 def filtrar_dados(coletas, criterio, valor):
     """Filtra coletas baseado em um critério"""
     if criterio == 'especie':
-        resultado = [c for c in coletas if c['especie'].lower() == valor.lower()]
+        resultado = consultar(coletas, Igual('especie', valor))
     elif criterio == 'praia':
-        resultado = [c for c in coletas if c['praia'].lower() == valor.lower()]
+        resultado = consultar(coletas, Igual('praia', valor))
     elif criterio == 'temperatura_min':
-        resultado = [c for c in coletas if c['temperatura_c'] >= float(valor)]
+        resultado = consultar(coletas, Entre('temperatura_c', minimo=float(valor)))
     elif criterio == 'temperatura_max':
-        resultado = [c for c in coletas if c['temperatura_c'] <= float(valor)]
+        resultado = consultar(coletas, Entre('temperatura_c', maximo=float(valor)))
     else:
         resultado = coletas
     
@@ -230,17 +900,19 @@ def main():
     print("🌊 ANÁLISE DE DADOS DE COLETAS - LABFICOL")
     print("="*70)
     
-    # Carregar dados
-    coletas = carregar_dados()
+    # Carregar dados (em colunas; carregar_dados() devolve a lista de dicionários)
+    coletas = carregar_tabela()
     
     if not coletas:
         print("\n⚠️ Não foi possível carregar os dados.")
         return
     
-    # Executar análises
-    estatisticas_basicas(coletas)
-    analise_por_especie(coletas)
-    analise_por_praia(coletas)
+    # Executar análises (uma única passada alimenta as três)
+    agregado = agregar(coletas)
+    estatisticas_basicas(agregado)
+    analise_por_especie(agregado)
+    analise_por_praia(agregado)
+    tabela_cruzada(coletas)
     
     # Exemplo de filtro
     print("\n" + "="*70)
@@ -249,6 +921,11 @@ def main():
     ulva = filtrar_dados(coletas, 'especie', 'Ulva lactuca')
     print(f"\n✅ {len(ulva)} registros de Ulva lactuca encontrados")
     
+    # Critérios combinados: Ulva ou Sargassum, com água a partir de 22°C
+    quentes = consultar(coletas, (Igual('especie', 'ulva lactuca') | Igual('especie', 'sargassum'))
+                        & Entre('temperatura_c', minimo=22))
+    print(f"✅ {len(quentes)} registros de Ulva ou Sargassum com temperatura ≥ 22°C")
+    
     # Exportar relatório
     exportar_relatorio(coletas)
     
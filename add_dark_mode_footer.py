@@ -3,8 +3,12 @@
 """
 Script para adicionar Dark Mode e Footer em todos os HTMLs
 Preserva encoding UTF-8 corretamente
+
+O scripts/build_site.py já aplica inject_dark_mode_and_footer() ao gerar as
+páginas; este script continua útil para HTMLs gerados por versões antigas.
 """
 
+import re
 from pathlib import Path
 
 # CSS do Dark Mode
@@ -465,6 +469,37 @@ FOOTER_HTML = """
     </footer>
 """
 
+def inject_dark_mode_and_footer(content: str, include_css: bool = True) -> str:
+    """Devolve o HTML com o dark mode e o footer aplicados.
+
+    Páginas que já têm o dark mode voltam sem alteração. Com
+    include_css=False o CSS não é embutido (o build_site.py já o inclui na
+    folha de estilos compartilhada). Levanta ValueError se faltar algum
+    marcador (</style>, </head>, </body>).
+    """
+    if 'dark-mode-toggle' in content:
+        return content
+
+    # Adicionar CSS antes de </style> (ou em um <style> próprio, nas
+    # páginas que usam a folha de estilos externa do build_site.py)
+    if not include_css:
+        pass
+    elif '</style>' in content:
+        content = content.replace('</style>', f'{DARK_MODE_CSS}\n    </style>', 1)
+    elif '</head>' in content:
+        content = content.replace('</head>', f'  <style>{DARK_MODE_CSS}\n    </style>\n  </head>', 1)
+    else:
+        raise ValueError("Não encontrou </style> nem </head>")
+
+    # Adicionar botão após <body>
+    content = re.sub(r'(<body[^>]*>)', rf'\1{DARK_MODE_BUTTON}', content, count=1)
+
+    # Adicionar script antes de </body>
+    if '</body>' not in content:
+        raise ValueError("Não encontrou </body>")
+    return content.replace('</body>', f'{DARK_MODE_SCRIPT}\n  {FOOTER_HTML}\n  </body>', 1)
+
+
 def add_dark_mode_and_footer():
     """Adiciona dark mode e footer em todos os HTMLs"""
     docs_html = Path('docs/html')
@@ -485,22 +520,10 @@ def add_dark_mode_and_footer():
                 print(f"[{count}] ⏭️  {html_file.name} - Já possui dark mode")
                 continue
             
-            # Adicionar CSS antes de </style>
-            if '</style>' in content:
-                content = content.replace('</style>', f'{DARK_MODE_CSS}\n    </style>', 1)
-            else:
-                print(f"[{count}] ⚠️  {html_file.name} - Não encontrou </style>")
-                continue
-            
-            # Adicionar botão após <body>
-            import re
-            content = re.sub(r'(<body[^>]*>)', rf'\1{DARK_MODE_BUTTON}', content, count=1)
-            
-            # Adicionar script antes de </body>
-            if '</body>' in content:
-                content = content.replace('</body>', f'{DARK_MODE_SCRIPT}\n  {FOOTER_HTML}\n  </body>', 1)
-            else:
-                print(f"[{count}] ⚠️  {html_file.name} - Não encontrou </body>")
+            try:
+                content = inject_dark_mode_and_footer(content)
+            except ValueError as e:
+                print(f"[{count}] ⚠️  {html_file.name} - {e}")
                 continue
             
             # Salvar com UTF-8
@@ -0,0 +1,105 @@
+// Add copy buttons to all code blocks (also called for lazily loaded sections)
+function addCopyButtons(root) {
+  const codeBlocks = root.querySelectorAll('pre');
+
+  codeBlocks.forEach(block => {
+    if (block.querySelector('.copy-btn')) return;
+    const button = document.createElement('button');
+    button.className = 'copy-btn';
+    button.textContent = 'Copiar';
+    button.setAttribute('aria-label', 'Copiar código');
+
+    button.addEventListener('click', async () => {
+      const code = block.querySelector('code');
+      const text = code ? code.textContent : block.textContent;
+
+      try {
+        await navigator.clipboard.writeText(text);
+        button.textContent = '✓ Copiado!';
+        button.classList.add('copied');
+
+        setTimeout(() => {
+          button.textContent = 'Copiar';
+          button.classList.remove('copied');
+        }, 2000);
+      } catch (err) {
+        button.textContent = '✗ Erro';
+        setTimeout(() => {
+          button.textContent = 'Copiar';
+        }, 2000);
+      }
+    });
+
+    block.style.position = 'relative';
+    block.appendChild(button);
+  });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+  addCopyButtons(document);
+});
+
+// Seções carregadas sob demanda (índices gerados com --lazy-sections).
+// Sem JavaScript, ou se o fragmento falhar, fica o link para a lição.
+document.addEventListener('DOMContentLoaded', function() {
+  const sections = document.querySelectorAll('section[data-fragment]');
+  if (sections.length === 0) return;
+
+  const load = section => {
+    if (section.dataset.loaded) return;
+    section.dataset.loaded = 'loading';
+    fetch(section.dataset.fragment)
+      .then(response => {
+        if (!response.ok) throw new Error(response.status);
+        return response.text();
+      })
+      .then(html => {
+        const body = section.querySelector('.section-body');
+        body.innerHTML = html;
+        addCopyButtons(body);
+        section.dataset.loaded = 'true';
+        section.dispatchEvent(new CustomEvent('section-loaded', { bubbles: true }));
+      })
+      .catch(() => {
+        section.dataset.loaded = 'error';
+      });
+  };
+
+  if (!('IntersectionObserver' in window)) {
+    sections.forEach(load);
+    return;
+  }
+  const observer = new IntersectionObserver(entries => {
+    entries.forEach(entry => {
+      if (entry.isIntersecting) {
+        observer.unobserve(entry.target);
+        load(entry.target);
+      }
+    });
+  }, { rootMargin: '800px 0px' });
+  sections.forEach(section => observer.observe(section));
+});
+
+// Tabs System
+document.addEventListener('DOMContentLoaded', function() {
+  const tabButtons = document.querySelectorAll('.tab-button');
+  const tabContents = document.querySelectorAll('.tab-content');
+
+  tabButtons.forEach((button, index) => {
+    button.addEventListener('click', () => {
+      // Remove active from all
+      tabButtons.forEach(btn => btn.classList.remove('active'));
+      tabContents.forEach(content => content.classList.remove('active'));
+
+      // Add active to clicked
+      button.classList.add('active');
+      tabContents[index].classList.add('active');
+    });
+  });
+
+  // Activate first tab by default
+  if (tabButtons.length > 0) {
+    tabButtons[0].classList.add('active');
+    tabContents[0].classList.add('active');
+  }
+});
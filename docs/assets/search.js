@@ -1,91 +1,140 @@
-// Sistema de busca em tempo real no conteúdo
+// Sistema de busca no conteúdo de todos os módulos
+// O índice invertido é gerado pelo scripts/build_site.py em assets/search-index/:
+// index.json lista as seções indexadas e cada <letra>.json guarda os termos
+// (sem acentos) que começam com aquela letra. Nada é carregado até a primeira busca.
+const SEARCH_SCRIPT_URL = document.currentScript ? document.currentScript.src : location.href;
+
 class CourseSearch {
-    constructor() {
-        this.index = [];
-        this.buildIndex();
+    constructor(scriptUrl) {
+        this.indexUrl = new URL('search-index/', scriptUrl);
+        this.docsRoot = new URL('../', scriptUrl);
+        this.meta = null;
+        this.shards = new Map();
     }
     
-    buildIndex() {
-        // Indexar títulos e parágrafos
-        const selectors = '.module-section h2, .module-section h3, .module-section p, .module-section li, .toc-item';
-        document.querySelectorAll(selectors).forEach(el => {
-            const text = el.textContent.trim();
-            if (text.length < 10) return; // Ignorar textos muito curtos
-            
-            this.index.push({
-                text: text,
-                element: el,
-                module: this.getModuleName(el),
-                type: el.tagName.toLowerCase(),
-                id: el.id || this.generateId(el)
-            });
-        });
-        
-        console.log(`📚 Índice de busca criado com ${this.index.length} itens`);
+    static fold(text) {
+        // mesma normalização do fold_accents() do build_site.py
+        return text.toLowerCase().normalize('NFKD').replace(/[\u0300-\u036f]/g, '');
     }
     
-    getModuleName(element) {
-        const path = window.location.pathname;
-        const match = path.match(/\/(\d+-[^\/]+)\//);
-        if (match) {
-            return match[1].replace(/-/g, ' ').replace(/\d+\s*/, '');
+    // Mesmas regras do tokenize() do build_site.py: as stopwords não estão no índice
+    tokenize(text, stopwords) {
+        return (CourseSearch.fold(text).match(/[a-z0-9_]+/g) || [])
+            .filter(w => w.length > 1 && !stopwords.has(w));
+    }
+    
+    loadMeta() {
+        if (!this.meta) {
+            this.meta = fetch(new URL('index.json', this.indexUrl))
+                .then(r => r.json())
+                .then(meta => ({ ...meta, shards: new Set(meta.shards), stopwords: new Set(meta.stopwords || []) }));
         }
-        return document.querySelector('.hero h1')?.textContent || 'Conteúdo';
+        return this.meta;
     }
     
-    generateId(element) {
-        if (!element.id) {
-            element.id = 'search-' + Math.random().toString(36).substr(2, 9);
+    loadShard(key) {
+        if (!this.shards.has(key)) {
+            const shard = fetch(new URL(key + '.json', this.indexUrl))
+                .then(r => r.ok ? r.json() : {})
+                .catch(() => ({}))
+                .then(data => ({ terms: Object.keys(data), postings: new Map(Object.entries(data)) }));
+            this.shards.set(key, shard);
         }
-        return element.id;
+        return this.shards.get(key);
     }
     
-    search(query) {
+    // Primeiro termo do shard (ordenado) que é >= prefix
+    lowerBound(terms, prefix) {
+        let lo = 0, hi = terms.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (terms[mid] < prefix) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+    
+    async lookup(meta, word, isLast) {
+        const scores = new Map();
+        if (!meta.shards.has(word[0])) return scores;
+        const shard = await this.loadShard(word[0]);
+        const add = (postings, factor) => {
+            for (let i = 0; i < postings.length; i += 2) {
+                scores.set(postings[i], (scores.get(postings[i]) || 0) + postings[i + 1] * factor);
+            }
+        };
+        if (shard.postings.has(word)) add(shard.postings.get(word), 3);
+        // A última palavra pode estar incompleta: aceita prefixos
+        if (isLast) {
+            for (let i = this.lowerBound(shard.terms, word); i < shard.terms.length; i++) {
+                const term = shard.terms[i];
+                if (!term.startsWith(word)) break;
+                if (term !== word) add(shard.postings.get(term), 1);
+            }
+        }
+        return scores;
+    }
+    
+    async search(query) {
         if (query.length < 2) return [];
+        const meta = await this.loadMeta();
+        const words = this.tokenize(query, meta.stopwords);
+        if (words.length === 0) return [];
+        const perWord = await Promise.all(words.map((w, i) => this.lookup(meta, w, i === words.length - 1)));
         
-        const lowerQuery = query.toLowerCase();
-        const words = lowerQuery.split(/\s+/).filter(w => w.length > 1);
-        
-        return this.index
-            .map(item => {
-                const text = item.text.toLowerCase();
-                let score = 0;
-                
-                // Pontuação por correspondência exata
-                if (text.includes(lowerQuery)) {
-                    score += 10;
-                }
-                
-                // Pontuação por palavras individuais
-                words.forEach(word => {
-                    if (text.includes(word)) {
-                        score += 3;
-                    }
-                });
-                
-                // Bônus para títulos
-                if (item.type === 'h2' || item.type === 'h3') {
-                    score *= 1.5;
-                }
-                
-                return { ...item, score };
-            })
-            .filter(item => item.score > 0)
-            .sort((a, b) => b.score - a.score);
+        // Todas as palavras precisam aparecer na seção
+        const [first, ...rest] = perWord;
+        const results = [];
+        first.forEach((score, doc) => {
+            let total = score;
+            for (const scores of rest) {
+                if (!scores.has(doc)) return;
+                total += scores.get(doc);
+            }
+            const [url, title, level, module, pageTitle] = meta.docs[doc];
+            results.push({ id: doc, url, title, level, module, pageTitle, score: total });
+        });
+        return results.sort((a, b) => b.score - a.score);
+    }
+    
+    getModuleName(module) {
+        return module.replace(/-/g, ' ').replace(/^\d+\s*/, '');
     }
     
-    highlight(results, query) {
+    // Elemento da página atual que corresponde ao resultado, se houver
+    localElement(result) {
+        const target = new URL(result.url, this.docsRoot);
+        const here = new URL(location.href);
+        const anchor = decodeURIComponent(target.hash.slice(1));
+        if (!anchor) return null;
+        const samePage = target.pathname === here.pathname;
+        // O índice consolidado do módulo reaproveita as âncoras das lições
+        const sameModule = here.pathname.includes('/' + result.module + '/') &&
+            /\/(index\.html)?$/.test(here.pathname);
+        return (samePage || sameModule) ? document.getElementById(anchor) : null;
+    }
+    
+    highlight(results) {
         // Remover highlights anteriores
         document.querySelectorAll('.search-highlight').forEach(el => {
             el.classList.remove('search-highlight');
         });
         
-        // Adicionar novos highlights
+        // Destacar os resultados presentes nesta página
         results.slice(0, 5).forEach(result => {
-            result.element.classList.add('search-highlight');
+            const element = this.localElement(result);
+            if (element) element.classList.add('search-highlight');
         });
     }
     
+    open(result) {
+        const element = this.localElement(result);
+        if (element) {
+            this.scrollTo(element.id);
+        } else {
+            location.href = new URL(result.url, this.docsRoot).href;
+        }
+    }
+    
     scrollTo(elementId) {
         const element = document.getElementById(elementId);
         if (element) {
@@ -101,7 +150,8 @@ class CourseSearch {
 
 // Inicializar busca
 document.addEventListener('DOMContentLoaded', function() {
-    const search = new CourseSearch();
+    const search = new CourseSearch(SEARCH_SCRIPT_URL);
+    let currentResults = [];
     
     // Criar UI de busca
     const searchBar = document.createElement('div');
@@ -139,11 +189,20 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
         
-        debounceTimer = setTimeout(() => {
-            const results = search.search(query);
-            displayResults(results.slice(0, 10), query);
-            search.highlight(results, query);
-        }, 300);
+        debounceTimer = setTimeout(async () => {
+            let results;
+            try {
+                results = await search.search(query);
+            } catch (err) {
+                console.warn('Índice de busca indisponível', err);
+                results = [];
+            }
+            // Ignorar respostas de buscas que já foram substituídas
+            if (searchInput.value.trim() !== query) return;
+            currentResults = results.slice(0, 10);
+            displayResults(currentResults, query);
+            search.highlight(results);
+        }, 150);
     });
     
     // Botão de limpar
@@ -174,24 +233,35 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
         
+        const escapeHtml = text => text.replace(/[&<>"']/g, ch => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        })[ch]);
+        
+        // Títulos vêm do índice como texto ("No <script> interno"): escapa cada
+        // trecho depois de separar o que casou com a consulta
         const highlightQuery = (text, query) => {
-            const regex = new RegExp(`(${query})`, 'gi');
-            return text.replace(regex, '<mark>$1</mark>');
+            const escaped = query.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+            const regex = new RegExp(`(${escaped})`, 'gi');
+            return text.split(regex)
+                .map((part, i) => i % 2 ? `<mark>${escapeHtml(part)}</mark>` : escapeHtml(part))
+                .join('');
         };
         
         searchResults.innerHTML = `
             <div class="results-header">
                 📚 ${results.length} resultado${results.length > 1 ? 's' : ''} encontrado${results.length > 1 ? 's' : ''}
             </div>
-            ${results.map(r => {
-                const preview = r.text.length > 120 ? r.text.substring(0, 120) + '...' : r.text;
+            ${results.map((r, i) => {
+                const type = 'h' + r.level;
+                const text = r.title === r.pageTitle ? r.title : `${r.title} — ${r.pageTitle}`;
+                const preview = text.length > 120 ? text.substring(0, 120) + '...' : text;
                 const highlighted = highlightQuery(preview, query);
                 
                 return `
-                    <div class="search-result-item" data-id="${r.id}">
-                        <div class="result-type">${getTypeIcon(r.type)} ${r.type.toUpperCase()}</div>
+                    <div class="search-result-item" data-index="${i}">
+                        <div class="result-type">${getTypeIcon(type)} ${type.toUpperCase()}</div>
                         <div class="result-text">${highlighted}</div>
-                        <div class="result-module">📂 ${r.module}</div>
+                        <div class="result-module">📂 ${search.getModuleName(r.module)}</div>
                     </div>
                 `;
             }).join('')}
@@ -202,8 +272,7 @@ document.addEventListener('DOMContentLoaded', function() {
         // Click nos resultados
         searchResults.querySelectorAll('.search-result-item').forEach(item => {
             item.addEventListener('click', function() {
-                const id = this.dataset.id;
-                search.scrollTo(id);
+                search.open(currentResults[Number(this.dataset.index)]);
                 searchInput.value = '';
                 searchResults.style.display = 'none';
                 clearBtn.style.display = 'none';
@@ -213,6 +282,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     function getTypeIcon(type) {
         const icons = {
+            'h1': '📘',
             'h2': '📌',
             'h3': '📍',
             'p': '📄',
@@ -1,11 +1,19 @@
-import os
+"""
+Corrige caracteres mal codificados (mojibake) nos HTMLs gerados
+
+O scripts/build_site.py já aplica fix_encoding() ao gerar as páginas; este
+script continua útil para HTMLs gerados por versões antigas.
+"""
+
+import re
+from collections import Counter
 from pathlib import Path
 
 # Mapeamento de caracteres mal codificados para corretos
 replacements = {
-    'ðŸ"š': '📚',
-    'ðŸ"‚': '📂',
-    'ðŸ'¬': '💬',
+    'ðŸ“š': '📚',
+    'ðŸ“‚': '📂',
+    'ðŸ’¬': '💬',
     'ðŸŒ™': '🌙',
     'â˜€ï¸': '☀️',
     'â˜€': '☀',
@@ -18,44 +26,117 @@ replacements = {
     'Ã£': 'ã',
     'Ãª': 'ê',
     'Ã´': 'ô',
-    'Ã"': 'Ó',
+    'Ã“': 'Ó',
     'Ãš': 'Ú',
-    'Ã': 'Á'
+    # 'Á' em UTF-8 lido como Latin-1; um 'Ã' sozinho é legítimo (NÃO, ENTÃO)
+    'Ã\x81': 'Á'
 }
 
-docs_html = Path('docs/html')
-count = 0
-success = 0
-
-print("🔧 Corrigindo encoding UTF-8...")
-print()
-
-for html_file in docs_html.rglob('*.html'):
-    try:
-        # Ler arquivo em UTF-8
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Aplicar substituições
-        modified = False
-        for wrong, correct in replacements.items():
-            if wrong in content:
-                content = content.replace(wrong, correct)
-                modified = True
-        
-        if modified:
-            # Salvar com UTF-8 com BOM
-            with open(html_file, 'w', encoding='utf-8-sig') as f:
-                f.write(content)
-            print(f"✓ {html_file.name}")
-            success += 1
-        
-        count += 1
-        
-    except Exception as e:
-        print(f"❌ Erro em {html_file.name}: {e}")
-
-print()
-print(f"🎉 Processo concluído!")
-print(f"Total: {count} arquivos")
-print(f"✅ Corrigidos: {success} arquivos")
+
+def _trie_regex(keys) -> str:
+    """Monta uma expressão regular a partir de uma trie das chaves.
+
+    Em cada posição do texto o regex percorre a trie uma única vez (em vez
+    de testar chave por chave) e, como os ramos mais longos vêm antes do fim
+    de chave, sempre fica com a correspondência mais longa.
+    """
+    trie: dict = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def walk(node: dict) -> str:
+        end = node.get('') is True
+        branches = [re.escape(ch) + walk(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            # a chave termina aqui, mas uma mais longa tem preferência
+            return f'(?:{body})?' if len(branches) == 1 else body + '?'
+        return body
+
+    return walk(trie)
+
+
+class MultiReplacer:
+    """Substitui várias sequências em uma única passada pelo texto.
+
+    Vale sempre a correspondência mais longa em cada posição, independente
+    da ordem do dicionário, e o texto é copiado uma única vez.
+    """
+
+    def __init__(self, mapping: dict[str, str]):
+        self.mapping = dict(mapping)
+        self.pattern = re.compile(_trie_regex(k for k in self.mapping if k))
+
+    def replace(self, text: str) -> tuple[str, Counter]:
+        """Devolve o texto corrigido e a contagem de cada sequência trocada"""
+        counts: Counter = Counter()
+        if not self.mapping:
+            return text, counts
+
+        def substitute(match):
+            wrong = match.group()
+            counts[wrong] += 1
+            return self.mapping[wrong]
+
+        return self.pattern.sub(substitute, text), counts
+
+
+_REPLACER = MultiReplacer(replacements)
+
+
+def fix_encoding_report(content: str) -> tuple[str, Counter]:
+    """Como fix_encoding(), mas também devolve quantas vezes cada sequência apareceu"""
+    return _REPLACER.replace(content)
+
+
+def fix_encoding(content: str) -> str:
+    """Devolve o texto com as sequências de `replacements` corrigidas"""
+    return _REPLACER.replace(content)[0]
+
+
+def main():
+    docs_html = Path('docs/html')
+    count = 0
+    success = 0
+    totals: Counter = Counter()
+
+    print("🔧 Corrigindo encoding UTF-8...")
+    print()
+
+    for html_file in docs_html.rglob('*.html'):
+        try:
+            # Ler arquivo em UTF-8
+            with open(html_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            # Aplicar substituições
+            fixed, counts = fix_encoding_report(content)
+            totals.update(counts)
+            
+            if fixed != content:
+                # Salvar com UTF-8 com BOM
+                with open(html_file, 'w', encoding='utf-8-sig') as f:
+                    f.write(fixed)
+                print(f"✓ {html_file.name}")
+                success += 1
+            
+            count += 1
+            
+        except Exception as e:
+            print(f"❌ Erro em {html_file.name}: {e}")
+
+    print()
+    print(f"🎉 Processo concluído!")
+    print(f"Total: {count} arquivos")
+    print(f"✅ Corrigidos: {success} arquivos")
+    for wrong, n in totals.most_common():
+        print(f"   {wrong!r} → {replacements[wrong]!r}: {n}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,28 @@
 # -*- coding: utf-8 -*-
 """
 Remove o footer antigo com 'Gerado automaticamente' dos HTMLs
+
+O scripts/build_site.py já aplica strip_old_footer() ao gerar as páginas;
+este script continua útil para HTMLs gerados por versões antigas.
 """
 
 from pathlib import Path
 import re
 
+# Padrão para encontrar o footer antigo
+OLD_FOOTER_PATTERN = re.compile(
+    r'\s*<footer role="contentinfo">\s*<p>Gerado automaticamente em.*?</p>\s*</footer>\s*',
+    re.DOTALL,
+)
+
+
+def strip_old_footer(content: str) -> str:
+    """Devolve o HTML sem o footer antigo (ou sem alteração, se não houver)"""
+    if 'Gerado automaticamente em' not in content:
+        return content
+    return OLD_FOOTER_PATTERN.sub('\n    ', content)
+
+
 def remove_old_footer():
     """Remove o footer antigo com timestamp"""
     docs_html = Path('docs/html')
@@ -16,9 +33,6 @@ def remove_old_footer():
     print("🗑️  Removendo footer antigo 'Gerado automaticamente'...")
     print()
     
-    # Padrão para encontrar o footer antigo
-    old_footer_pattern = r'\s*<footer role="contentinfo">\s*<p>Gerado automaticamente em.*?</p>\s*</footer>\s*'
-    
     for html_file in docs_html.rglob('*.html'):
         count += 1
         try:
@@ -31,7 +45,7 @@ def remove_old_footer():
                 continue
             
             # Remover o footer antigo (com espaços e quebras de linha)
-            new_content = re.sub(old_footer_pattern, '\n    ', content, flags=re.DOTALL)
+            new_content = strip_old_footer(content)
             
             # Verificar se algo foi removido
             if new_content == content:
@@ -0,0 +1,310 @@
+"""
+Benchmarks do gerador do site (scripts/build_site.py).
+
+Modo de uso:
+  python scripts/bench_build.py setup            -> custo de preparação do Markdown por página
+  python scripts/bench_build.py setup -n 50 0-Fundamentos/00-Glossario.md
+  python scripts/bench_build.py corpus           -> build completo sobre um curso sintético
+  python scripts/bench_build.py corpus --modules 20 --lessons 30 --baseline bench-baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import random
+import re
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import markdown
+
+import build_site
+
+
+def _timeit(fn, repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_setup(files: list[Path], repeat: int):
+    """Compara markdown.markdown() (novo Markdown a cada chamada) com o
+    conversor reaproveitado de build_site.md_to_html()."""
+    texts = [(md.relative_to(build_site.ROOT).as_posix(), md.read_text(encoding='utf-8')) for md in files]
+    build_site._HIGHLIGHT_CACHE = None  # mede o Pygments de verdade nas duas variantes
+    build_site.get_converter()  # o custo de criação é pago uma vez, fora da medição
+
+    construct = _timeit(lambda: markdown.Markdown(extensions=build_site.converter_extensions()), repeat)
+    print(f"Criação do Markdown com as extensões do build: {statistics.median(construct) * 1000:.3f} ms (mediana)")
+    print()
+    print(f"{'arquivo':<48} {'por chamada':>12} {'reaproveitado':>14} {'ganho':>7}")
+    total_fresh = total_reused = 0.0
+    for name, text in texts:
+        fresh = statistics.median(_timeit(
+            lambda: markdown.markdown(text, extensions=build_site.converter_extensions()), repeat))
+        reused = statistics.median(_timeit(lambda: build_site.md_to_html(text), repeat))
+        total_fresh += fresh
+        total_reused += reused
+        print(f"{name:<48} {fresh * 1000:>9.3f} ms {reused * 1000:>11.3f} ms {fresh / reused:>6.2f}x")
+    print(f"{'TOTAL':<48} {total_fresh * 1000:>9.3f} ms {total_reused * 1000:>11.3f} ms {total_fresh / total_reused:>6.2f}x")
+
+
+# ---------------------------------------------------------------------------
+# Curso sintético
+# ---------------------------------------------------------------------------
+
+FENCE_RE = re.compile(r"^```(\w+)\n(.*?)^```", re.MULTILINE | re.DOTALL)
+
+
+def sample_content(root: Path) -> tuple[dict[str, list[str]], list[str]]:
+    """Blocos de código (por linguagem) e parágrafos reais das lições do repositório."""
+    code: dict[str, list[str]] = {}
+    paragraphs: list[str] = []
+    for md in sorted(root.glob('*/*.md')):
+        text = md.read_text(encoding='utf-8')
+        for lang, block in FENCE_RE.findall(text):
+            code.setdefault(lang, []).append(block.rstrip('\n'))
+        for line in FENCE_RE.sub('', text).splitlines():
+            line = line.strip()
+            if len(line) > 60 and not line.startswith(('#', '|', '-', '*', '>', '<')):
+                paragraphs.append(line)
+    return code, paragraphs
+
+
+def generate_corpus(target: Path, modules: int, lessons: int, code_blocks: int, tables: int,
+                    languages: list[str], seed: int = 0) -> list[str]:
+    """Cria `modules` módulos com `lessons` lições cada, no estilo de 0-Fundamentos…6-Machine-Learning.
+
+    Os blocos de código e parágrafos vêm das lições reais; cada bloco ganha um
+    comentário numerado para não coincidir com outro (o cache de destaque de
+    sintaxe não mascara o custo do Pygments no build frio).
+    """
+    rng = random.Random(seed)
+    code_pool, paragraphs = sample_content(build_site.ROOT)
+    languages = [lang for lang in languages if code_pool.get(lang)] or ['python']
+    comment = {'python': '#', 'bash': '#', 'powershell': '#', 'javascript': '//', 'css': '/*', 'html': '<!--'}
+    names = []
+    serial = 0
+    for m in range(modules):
+        name = f"{m}-Modulo-Sintetico-{m}"
+        names.append(name)
+        mod_dir = target / name
+        mod_dir.mkdir(parents=True, exist_ok=True)
+        for n in range(lessons):
+            stem = "00-Glossario" if n == 0 else f"{n:02d}-Licao-{n}"
+            parts = [f"# 📘 Lição {n} do módulo {m}\n", rng.choice(paragraphs), ""]
+            for b in range(code_blocks):
+                lang = rng.choice(languages)
+                serial += 1
+                mark = comment.get(lang, '#')
+                parts += [f"## Exemplo {b + 1}\n", rng.choice(paragraphs), "",
+                          f"```{lang}\n{mark} exemplo {serial}\n{rng.choice(code_pool[lang])}\n```", ""]
+            for t in range(tables):
+                rows = [f"| {rng.randint(1, 99)} | Espécie {rng.randint(1, 20)} | {rng.uniform(0, 400):.1f} |"
+                        for _ in range(8)]
+                parts += [f"### Tabela {t + 1}\n", "| ID | Espécie | Biomassa (g) |", "|---|---|---|", *rows, ""]
+            (mod_dir / f"{stem}.md").write_text("\n".join(parts), encoding='utf-8')
+    return names
+
+
+# ---------------------------------------------------------------------------
+# Cenários (cada um roda em um processo novo, para medir o pico de memória)
+# ---------------------------------------------------------------------------
+
+def exclusive_stage_times(events: list[dict]) -> dict[str, float]:
+    """Tempo exclusivo (s) de cada etapa nos eventos do build_site.Profiler.
+
+    A duração de um evento desconta a das etapas aninhadas nele (no índice do
+    módulo, por exemplo, a conversão de uma lição ainda não renderizada roda
+    dentro de 'write'), então as etapas não se sobrepõem. Com --jobs > 1 os
+    tempos dos processos do pool são somados.
+    """
+    totals: dict[str, float] = {}
+    threads: dict[tuple, list[dict]] = {}
+    for event in events:
+        threads.setdefault((event['pid'], event['tid']), []).append(event)
+
+    def close(frame):
+        event, _, nested = frame
+        totals[event['name']] = totals.get(event['name'], 0.0) + (event['dur'] - nested) / 1e6
+
+    for thread_events in threads.values():
+        stack: list[list] = []  # [evento, fim, duração das etapas aninhadas]
+        for event in sorted(thread_events, key=lambda e: (e['ts'], -e['dur'])):
+            while stack and event['ts'] >= stack[-1][1]:
+                close(stack.pop())
+            if stack:
+                stack[-1][2] += event['dur']
+            stack.append([event, event['ts'] + event['dur'], 0.0])
+        while stack:
+            close(stack.pop())
+    return totals
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss está em KB no Linux e em bytes no macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale / 1e6
+
+
+def run_scenario(name: str, root: str, modules: list[str], jobs: int) -> dict:
+    root_path = Path(root)
+    build_site.set_root(root_path, modules)
+    md_files = [md for m in modules for md in sorted((root_path / m).glob('*.md'))]
+    if name == 'build_all_cold':
+        shutil.rmtree(build_site.CACHE_DIR, ignore_errors=True)
+        shutil.rmtree(build_site.OUT, ignore_errors=True)
+    elif name == 'build_all_warm':
+        # sem manifesto nem saída, mas com o cache de destaque de sintaxe
+        build_site.MANIFEST_PATH.unlink(missing_ok=True)
+        shutil.rmtree(build_site.OUT, ignore_errors=True)
+
+    # os eventos do --profile, só com o tempo; os processos do pool devolvem os seus
+    build_site._PROFILER = build_site.Profiler(memory=False)
+
+    build_site.ensure_dirs()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if name.startswith('build_all'):
+            build_site.build_all(incremental=(name == 'build_all_incremental'), jobs=jobs)
+            pages = len(md_files) + len(modules)
+        elif name == 'build_page':
+            for md in md_files:
+                build_site.build_page(md, build_site.OUT / md.relative_to(root_path).with_suffix('.html'))
+            pages = len(md_files)
+        elif name == 'build_module_index':
+            for m in modules:
+                build_site.build_module_index(root_path / m)
+            pages = len(modules)
+        else:
+            raise ValueError(f"cenário desconhecido: {name}")
+    seconds = time.perf_counter() - start
+    stages = exclusive_stage_times(build_site._PROFILER.events)
+    md_bytes = sum(md.stat().st_size for md in md_files)
+    return {
+        'seconds': round(seconds, 4),
+        'pages': pages,
+        'pages_per_s': round(pages / seconds, 2),
+        'mb_per_s': round(md_bytes / 1e6 / seconds, 3),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'stages': {k: round(v, 4) for k, v in sorted(stages.items())},
+    }
+
+
+SCENARIOS = ['build_all_cold', 'build_all_warm', 'build_all_incremental', 'build_page', 'build_module_index']
+
+
+def bench_corpus(args) -> int:
+    languages = [lang.strip() for lang in args.languages.split(',') if lang.strip()]
+    workdir = Path(tempfile.mkdtemp(prefix='labficol-bench-'))
+    try:
+        modules = generate_corpus(workdir, args.modules, args.lessons, args.code_blocks, args.tables,
+                                  languages, args.seed)
+        md_files = list(workdir.glob('*/*.md'))
+        corpus = {
+            'modules': args.modules, 'lessons': args.lessons, 'code_blocks': args.code_blocks,
+            'tables': args.tables, 'languages': languages, 'seed': args.seed,
+            'md_files': len(md_files), 'md_mb': round(sum(md.stat().st_size for md in md_files) / 1e6, 3),
+        }
+        print(f"Curso sintético: {corpus['md_files']} lições, {corpus['md_mb']} MB de Markdown em {workdir}")
+
+        ctx = multiprocessing.get_context('spawn')
+        scenarios = {}
+        for name in SCENARIOS:
+            # ProcessPoolExecutor: ao contrário do multiprocessing.Pool, seus processos
+            # não são daemon e podem abrir o pool do build_all quando --jobs > 1
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                scenarios[name] = pool.submit(run_scenario, name, str(workdir), modules, args.jobs).result()
+            r = scenarios[name]
+            print(f"  {name:<24} {r['seconds']:>8.3f} s  {r['pages_per_s']:>8.1f} pág/s  "
+                  f"{r['mb_per_s']:>7.3f} MB/s  pico {r['peak_rss_mb']:>6.1f} MB")
+        html_mb = sum(f.stat().st_size for f in (workdir / 'docs' / 'html').rglob('*.html')) / 1e6
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        'environment': {
+            'python': platform.python_version(), 'markdown': markdown.__version__,
+            'pygments': build_site.pygments.__version__, 'platform': platform.platform(),
+            'cpu_count': multiprocessing.cpu_count(), 'jobs': args.jobs,
+        },
+        'corpus': {**corpus, 'html_mb': round(html_mb, 3)},
+        'scenarios': scenarios,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"Resultados em {args.output}")
+
+    if args.baseline:
+        return compare_baseline(results, json.loads(args.baseline.read_text(encoding='utf-8')), args.threshold)
+    return 0
+
+
+def compare_baseline(results: dict, baseline: dict, threshold: float) -> int:
+    """Compara o tempo de cada cenário com a linha de base; devolve 1 se algum piorou além do limite."""
+    if baseline.get('corpus', {}).get('md_files') != results['corpus']['md_files']:
+        print("⚠️  A linha de base foi medida com outro curso sintético; a comparação é só indicativa.")
+    print()
+    print(f"{'cenário':<24} {'base':>9} {'atual':>9} {'variação':>9}")
+    regressions = 0
+    for name, current in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if not old:
+            continue
+        change = current['seconds'] / old['seconds'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  ❌ regressão'
+            regressions += 1
+        print(f"{name:<24} {old['seconds']:>8.3f}s {current['seconds']:>8.3f}s {change:>+8.1%}{flag}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do gerador do site.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    setup = sub.add_parser('setup', help="custo de preparação do Markdown por página")
+    setup.add_argument('files', nargs='*', help="arquivos .md (padrão: todos os 00-Glossario.md)")
+    setup.add_argument('-n', '--repeat', type=int, default=20)
+    corpus = sub.add_parser('corpus', help="build completo sobre um curso sintético")
+    corpus.add_argument('--modules', type=int, default=7)
+    corpus.add_argument('--lessons', type=int, default=4, help="lições por módulo")
+    corpus.add_argument('--code-blocks', type=int, default=12, help="blocos de código por lição")
+    corpus.add_argument('--tables', type=int, default=2, help="tabelas por lição")
+    corpus.add_argument('--languages', default='python,bash,javascript,html,powershell')
+    corpus.add_argument('--seed', type=int, default=0)
+    corpus.add_argument('--jobs', '-j', type=int, default=1)
+    corpus.add_argument('--output', type=Path, default=build_site.CACHE_DIR / 'bench' / 'results.json')
+    corpus.add_argument('--baseline', type=Path, help="resultados anteriores para comparação")
+    corpus.add_argument('--threshold', type=float, default=0.10,
+                        help="variação de tempo considerada regressão (padrão: 0.10 = 10%%)")
+    corpus.add_argument('--keep', action='store_true', help="não apaga o curso sintético ao final")
+    args = parser.parse_args()
+
+    if args.command == 'setup':
+        files = [build_site.ROOT / f for f in args.files] or sorted(build_site.ROOT.glob('*/00-Glossario.md'))
+        if not files:
+            print("Nenhum arquivo .md encontrado.")
+            sys.exit(1)
+        bench_setup(files, args.repeat)
+    elif args.command == 'corpus':
+        sys.exit(bench_corpus(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,56 @@
+import argparse
+import contextlib
+import gzip
+import hashlib
+import itertools
+import json
 import os
+import posixpath
 import re
+import shutil
+import subprocess
 import sys
+import threading
+import time
+import tracemalloc
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from datetime import datetime
-from markdown import markdown
+from urllib.parse import unquote
+from html import escape, unescape
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import markdown
+import pygments
+from markdown.extensions import codehilite, fenced_code
+from markdown.treeprocessors import Treeprocessor
+
+try:
+    import brotli
+except ImportError:  # opcional: sem ele, só são gerados os .gz
+    brotli = None
 
 ROOT = Path(__file__).resolve().parents[1]
+
+# os scripts de pós-processamento ficam na raiz do repositório
+sys.path.insert(0, str(ROOT))
+import add_dark_mode_footer
+import fix_encoding
+import remove_old_footer
+
 DOCS = ROOT / "docs"
 OUT = DOCS / "html"
 ASSETS = DOCS / "assets"
+CACHE_DIR = ROOT / ".build-cache"
+MANIFEST_PATH = CACHE_DIR / "manifest.json"
+MANIFEST_VERSION = 3
+HIGHLIGHT_CACHE_DIR = CACHE_DIR / "highlight"
+HIGHLIGHT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+SEARCH_INDEX_DIR = ASSETS / "search-index"
+# extensões que ganham cópias pré-comprimidas (.gz/.br) com --compress
+COMPRESS_EXTS = {'.html', '.css', '.js', '.json'}
 REPO_URL = "https://github.com/caetanoronan/labficol-tutorial"
 SITE_URL = "https://caetanoronan.github.io/labficol-tutorial/"
 LAFIC_NAME = "Laboratório de Ficologia (LAFIC)"
@@ -35,682 +77,797 @@ MD_EXTS = [
     'attr_list',
 ]
 
+# Estilos e scripts comuns a todas as páginas. São gravados em docs/assets
+# com o hash do conteúdo no nome (ver write_page_assets), para que o
+# navegador possa guardá-los em cache por tempo indeterminado.
+PAGE_CSS = """* { box-sizing: border-box; }
+body { 
+  margin: 0; 
+  background: linear-gradient(135deg, #e5f5f9 0%, #99d8c9 50%, #2ca25f 100%) !important;
+  min-height: 100vh;
+  color: #062b1e !important;
+  font-family: system-ui, -apple-system, sans-serif;
+  line-height: 1.6;
+}
+header { 
+  background: linear-gradient(120deg, #2ca25f, #1e7d5a) !important;
+  color: #fff !important;
+  padding: 20px;
+  box-shadow: 0 4px 12px rgba(0,0,0,0.2);
+}
+header h1 { color: #fff !important; margin: 0; font-size: 1.8rem; }
+main { max-width: 1000px; margin: 24px auto; padding: 0 16px; }
+.module-content { display: grid; gap: 24px; }
+.module-section { 
+  background: #fff !important;
+  border: 3px solid #99d8c9 !important;
+  border-radius: 14px;
+  padding: 18px;
+  box-shadow: 0 16px 40px rgba(0,0,0,0.18);
+}
+.module-section h2 { 
+  color: #2ca25f !important; 
+  border-left: 8px solid #2ca25f; 
+  padding-left: 12px;
+  margin-top: 0;
+}
+.module-section h3 { color: #2ca25f !important; }
+.module-section p, .module-section li { color: #062b1e !important; }
+.module-section code { background: #e5f5f9 !important; padding: 2px 6px; border-radius: 4px; color: #062b1e; }
+.module-section pre { 
+  position: relative;
+  background: #1e1e1e !important; 
+  border-left: 6px solid #2ca25f !important;
+  padding: 14px 50px 14px 14px;
+  overflow-x: auto;
+  border-radius: 8px;
+  font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
+  font-size: 14px;
+  line-height: 1.5;
+}
+.module-section pre code { 
+  background: transparent !important; 
+  color: #d4d4d4 !important; 
+  padding: 0; 
+}
+
+/* Copy Button */
+.copy-btn {
+  position: absolute;
+  top: 8px;
+  right: 8px;
+  background: #2ca25f !important;
+  color: #fff !important;
+  border: none;
+  border-radius: 6px;
+  padding: 6px 12px;
+  font-size: 12px;
+  font-weight: 700;
+  cursor: pointer;
+  transition: all 0.3s;
+  z-index: 10;
+}
+.copy-btn:hover {
+  background: #1e7d5a !important;
+  transform: scale(1.05);
+}
+.copy-btn.copied {
+  background: #4ec9b0 !important;
+}
+
+/* Seções carregadas sob demanda (--lazy-sections) */
+.section-placeholder { min-height: 6em; color: #4a6b5d !important; }
+.section-placeholder a { font-weight: 700; }
+
+/* Syntax Highlighting - VS Code Dark Theme (FIXED CONTRAST) */
+.codehilite { background: #1e1e1e !important; border-radius: 8px; }
+.codehilite .hll { background-color: #3e3e42; }
+.codehilite .c { color: #6a9955; font-style: italic; } /* Comentarios */
+.codehilite .k { color: #c586c0; font-weight: bold; } /* Keywords (def, if, for) */
+.codehilite .kn { color: #c586c0; } /* import */
+.codehilite .kt { color: #4ec9b0; } /* tipos */
+.codehilite .nc { color: #4ec9b0; } /* Classes */
+.codehilite .nf { color: #dcdcaa; } /* Funcoes */
+.codehilite .nb { color: #4ec9b0; } /* Built-ins (print, len) */
+.codehilite .s, .codehilite .s1, .codehilite .s2 { color: #ce9178; } /* Strings */
+.codehilite .si { color: #d7ba7d; } /* String interpolation */
+.codehilite .m, .codehilite .mi, .codehilite .mf { color: #b5cea8; } /* Numeros */
+.codehilite .o { color: #d4d4d4; } /* Operadores */
+.codehilite .ow { color: #c586c0; } /* Operadores palavra (and, or) */
+.codehilite .n { color: #9cdcfe; } /* Variaveis */
+.codehilite .na { color: #9cdcfe; } /* Atributos */
+.codehilite .bp { color: #c586c0; } /* self */
+.codehilite .err { color: #f48771; background: transparent; } /* Erros - SEM fundo preto */
+.codehilite .fm { color: #dcdcaa; } /* Magic methods */
+.codehilite .nn { color: #4ec9b0; } /* Namespace */
+.codehilite .p { color: #d4d4d4; } /* Pontuacao - cinza claro ao inves de preto */
+.codehilite .w { color: #d4d4d4; } /* Whitespace */
+
+/* Garantir que NADA seja preto em blocos de codigo */
+pre, pre *, .codehilite, .codehilite * {
+  color: #d4d4d4 !important;
+}
+
+/* Reaplica cores especificas por cima da regra geral */
+.codehilite .c { color: #6a9955 !important; font-style: italic; }
+.codehilite .k { color: #c586c0 !important; font-weight: bold; }
+.codehilite .kn { color: #c586c0 !important; }
+.codehilite .kt { color: #4ec9b0 !important; }
+.codehilite .nc { color: #4ec9b0 !important; }
+.codehilite .nf { color: #dcdcaa !important; }
+.codehilite .nb { color: #4ec9b0 !important; }
+.codehilite .s, .codehilite .s1, .codehilite .s2 { color: #ce9178 !important; }
+.codehilite .si { color: #d7ba7d !important; }
+.codehilite .m, .codehilite .mi, .codehilite .mf { color: #b5cea8 !important; }
+.codehilite .o { color: #d4d4d4 !important; }
+.codehilite .ow { color: #c586c0 !important; }
+.codehilite .n { color: #9cdcfe !important; }
+.codehilite .na { color: #9cdcfe !important; }
+.codehilite .bp { color: #c586c0 !important; }
+.codehilite .err { color: #f48771 !important; background: transparent !important; }
+.codehilite .fm { color: #dcdcaa !important; }
+.codehilite .nn { color: #4ec9b0 !important; }
+.codehilite .p { color: #d4d4d4 !important; }
+.codehilite .w { color: #d4d4d4 !important; }
+
+/* Tabs System */
+.tabs-container { margin: 20px 0; }
+.tabs-nav {
+  display: flex;
+  gap: 8px;
+  flex-wrap: wrap;
+  background: rgba(255,255,255,0.3);
+  padding: 12px;
+  border-radius: 12px 12px 0 0;
+  border-bottom: 3px solid #2ca25f;
+}
+.tab-button {
+  background: #fff;
+  color: #2ca25f;
+  border: 2px solid #99d8c9;
+  border-radius: 8px;
+  padding: 10px 18px;
+  cursor: pointer;
+  font-weight: 700;
+  font-size: 15px;
+  transition: all 0.3s;
+}
+.tab-button:hover {
+  background: #e5f5f9;
+  transform: translateY(-2px);
+}
+.tab-button.active {
+  background: #2ca25f !important;
+  color: #fff !important;
+  border-color: #1e7d5a;
+  box-shadow: 0 4px 12px rgba(44, 162, 95, 0.3);
+}
+.tab-content {
+  display: none;
+  background: #fff;
+  border: 3px solid #99d8c9;
+  border-top: none;
+  border-radius: 0 0 14px 14px;
+  padding: 24px;
+  animation: fadeIn 0.3s;
+}
+.tab-content.active {
+  display: block;
+}
+@keyframes fadeIn {
+  from { opacity: 0; transform: translateY(-10px); }
+  to { opacity: 1; transform: translateY(0); }
+}
+
+.hero {
+  background: linear-gradient(120deg, #99d8c9, #2ca25f) !important;
+  border: 3px solid #1e7d5a !important;
+  border-left: 12px solid #1e7d5a !important;
+  border-radius: 14px;
+  padding: 24px;
+  margin-bottom: 28px;
+  box-shadow: 0 16px 40px rgba(0,0,0,0.18);
+}
+.hero h2 { margin: 0 0 12px; color: #fff !important; font-size: 2rem; }
+.hero h3 { margin: 16px 0 10px; color: #fff !important; font-size: 1.4rem; }
+.hero p { color: #fff !important; font-size: 1.08rem; }
+.hero ul { margin: 10px 0; padding-left: 24px; color: #fff !important; }
+.hero li { color: #fff !important; margin: 6px 0; }
+.chips { display: flex; flex-wrap: wrap; gap: 10px; margin-top: 14px; }
+.chip {
+  background: #1e7d5a !important;
+  color: #fff !important;
+  border: 2px solid #156048 !important;
+  border-radius: 999px;
+  padding: 9px 14px;
+  font-weight: 700;
+  font-size: 0.92rem;
+  box-shadow: 0 2px 8px rgba(0,0,0,0.15);
+}
+
+/* Module TOC Summary */
+.module-toc-summary {
+  background: linear-gradient(135deg, #fff 0%, #e5f5f9 100%);
+  border: 3px solid #2ca25f;
+  border-left: 12px solid #2ca25f;
+  border-radius: 14px;
+  padding: 24px;
+  margin: 24px 0;
+  box-shadow: 0 8px 24px rgba(0,0,0,0.12);
+}
+.module-toc-summary h2 {
+  color: #2ca25f !important;
+  margin: 0 0 16px;
+  font-size: 1.5rem;
+  border: none !important;
+  padding: 0 !important;
+}
+.toc-list {
+  list-style: none;
+  padding: 0;
+  margin: 0;
+  display: grid;
+  gap: 12px;
+}
+.toc-item {
+  background: #fff;
+  border: 2px solid #99d8c9;
+  border-radius: 10px;
+  transition: all 0.3s;
+}
+.toc-item:hover {
+  border-color: #2ca25f;
+  transform: translateX(8px);
+  box-shadow: 0 4px 12px rgba(44, 162, 95, 0.2);
+}
+.toc-link {
+  display: block;
+  padding: 16px;
+  text-decoration: none;
+  color: inherit;
+}
+.toc-link strong {
+  display: block;
+  color: #2ca25f !important;
+  font-size: 1.1rem;
+  margin-bottom: 6px;
+}
+.toc-preview {
+  display: block;
+  color: #555 !important;
+  font-size: 0.9rem;
+  line-height: 1.4;
+}
+
+footer { max-width: 1000px; margin: 24px auto; padding: 0 16px 24px; color: #333; text-align: center; }
+
+/* ===== PROGRESS TRACKING STYLES ===== */
+.progress-container {
+  background: #e5f5f9;
+  padding: 20px;
+  border-radius: 10px;
+  margin-bottom: 30px;
+  border: 2px solid #99d8c9;
+}
+.progress-header {
+  display: flex;
+  justify-content: space-between;
+  align-items: center;
+  margin-bottom: 15px;
+}
+.progress-header h3 {
+  margin: 0;
+  color: #2ca25f !important;
+}
+.reset-progress-btn {
+  background: #ff6b6b;
+  color: white;
+  border: none;
+  padding: 8px 16px;
+  border-radius: 6px;
+  cursor: pointer;
+  font-size: 14px;
+  transition: all 0.2s;
+}
+.reset-progress-btn:hover {
+  background: #ee5a52;
+  transform: translateY(-2px);
+}
+.progress-bar-container {
+  background: white;
+  height: 40px;
+  border-radius: 20px;
+  overflow: hidden;
+  border: 2px solid #99d8c9;
+}
+.module-progress-bar {
+  height: 100%;
+  background: linear-gradient(90deg, #2ca25f, #10a05d);
+  display: flex;
+  align-items: center;
+  justify-content: center;
+  color: white;
+  font-weight: bold;
+  font-size: 14px;
+  transition: width 0.5s ease;
+  min-width: 80px;
+}
+.lesson-checkbox {
+  width: 20px;
+  height: 20px;
+  cursor: pointer;
+  accent-color: #2ca25f;
+}
+.lesson-checkbox-container {
+  vertical-align: middle;
+}
+
+/* ===== SEARCH STYLES ===== */
+.search-bar {
+  background: white;
+  padding: 20px;
+  border-radius: 10px;
+  margin-bottom: 20px;
+  box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+  border: 2px solid #99d8c9;
+}
+.search-input-container {
+  position: relative;
+  display: flex;
+  align-items: center;
+}
+#searchInput {
+  width: 100%;
+  padding: 14px 50px 14px 16px;
+  font-size: 16px;
+  border: 2px solid #2ca25f;
+  border-radius: 8px;
+  outline: none;
+  transition: all 0.2s;
+}
+#searchInput:focus {
+  border-color: #238b53;
+  box-shadow: 0 0 0 3px rgba(44, 162, 95, 0.1);
+}
+.clear-search-btn {
+  position: absolute;
+  right: 10px;
+  background: transparent;
+  border: none;
+  font-size: 20px;
+  cursor: pointer;
+  color: #999;
+  padding: 5px 10px;
+  transition: color 0.2s;
+}
+.clear-search-btn:hover {
+  color: #ff6b6b;
+}
+.search-results {
+  margin-top: 15px;
+  max-height: 400px;
+  overflow-y: auto;
+  border-radius: 8px;
+}
+.results-header {
+  background: #e5f5f9;
+  padding: 10px 15px;
+  font-weight: bold;
+  color: #2ca25f;
+  border-radius: 6px 6px 0 0;
+}
+.search-result-item {
+  padding: 12px 15px;
+  border-bottom: 1px solid #eee;
+  cursor: pointer;
+  transition: all 0.2s;
+}
+.search-result-item:hover {
+  background: #f7fafc;
+  border-left: 4px solid #2ca25f;
+}
+.result-type {
+  font-size: 11px;
+  color: #999;
+  text-transform: uppercase;
+  margin-bottom: 5px;
+}
+.result-text {
+  margin-bottom: 5px;
+  line-height: 1.5;
+}
+.result-text mark {
+  background: #ffeb3b;
+  padding: 2px 4px;
+  border-radius: 3px;
+}
+.result-module {
+  font-size: 12px;
+  color: #666;
+}
+.no-results {
+  padding: 20px;
+  text-align: center;
+  color: #999;
+}
+.search-highlight {
+  background: #ffeb3b !important;
+  padding: 4px;
+  border-radius: 4px;
+  transition: background 0.3s;
+}
+.search-highlight-active {
+  background: #ffc107 !important;
+  animation: pulse 0.5s ease;
+}
+@keyframes pulse {
+  0%, 100% { transform: scale(1); }
+  50% { transform: scale(1.05); }
+}
+
+/* ===== QUIZ STYLES ===== */
+.quiz-card {
+  background: white;
+  padding: 30px;
+  border-radius: 12px;
+  box-shadow: 0 8px 24px rgba(0,0,0,0.15);
+  border: 2px solid #99d8c9;
+  margin: 20px 0;
+}
+.quiz-progress-bar {
+  height: 8px;
+  background: #e0e0e0;
+  border-radius: 4px;
+  margin-bottom: 20px;
+  overflow: hidden;
+}
+.quiz-progress-fill {
+  height: 100%;
+  background: linear-gradient(90deg, #2ca25f, #10a05d);
+  transition: width 0.5s ease;
+}
+.quiz-header {
+  display: flex;
+  justify-content: space-between;
+  margin-bottom: 20px;
+  font-size: 14px;
+}
+.quiz-counter {
+  color: #666;
+  font-weight: 500;
+}
+.quiz-score {
+  color: #2ca25f;
+  font-weight: bold;
+}
+.quiz-question {
+  color: #2ca25f !important;
+  font-size: 1.3rem;
+  margin-bottom: 20px;
+}
+.quiz-code {
+  background: #1e1e1e !important;
+  color: #d4d4d4 !important;
+  padding: 15px;
+  border-radius: 8px;
+  margin: 15px 0;
+  font-family: 'Consolas', monospace;
+}
+.quiz-options {
+  display: grid;
+  gap: 12px;
+  margin: 20px 0;
+}
+.quiz-option {
+  display: flex;
+  align-items: center;
+  padding: 15px;
+  background: #f7fafc;
+  border: 2px solid #e2e8f0;
+  border-radius: 10px;
+  cursor: pointer;
+  text-align: left;
+  font-size: 16px;
+  transition: all 0.2s;
+  gap: 12px;
+}
+.quiz-option:hover:not(.disabled) {
+  background: #e5f5f9;
+  border-color: #2ca25f;
+  transform: translateX(5px);
+}
+.quiz-option.disabled {
+  cursor: not-allowed;
+  opacity: 0.7;
+}
+.quiz-option.correct {
+  background: #d4f4dd;
+  border-color: #2ca25f;
+  border-width: 3px;
+}
+.quiz-option.incorrect {
+  background: #ffe0e0;
+  border-color: #ff6b6b;
+  border-width: 3px;
+}
+.option-letter {
+  display: flex;
+  align-items: center;
+  justify-content: center;
+  min-width: 32px;
+  height: 32px;
+  background: #2ca25f;
+  color: white;
+  border-radius: 50%;
+  font-weight: bold;
+  font-size: 14px;
+}
+.quiz-option.correct .option-letter {
+  background: #10a05d;
+}
+.quiz-option.incorrect .option-letter {
+  background: #ff6b6b;
+}
+.option-text {
+  flex: 1;
+}
+.quiz-feedback {
+  margin-top: 20px;
+  padding: 15px;
+  border-radius: 8px;
+  font-size: 16px;
+  font-weight: 500;
+}
+.feedback-correct {
+  background: #d4f4dd;
+  color: #1e7d5a;
+  display: flex;
+  align-items: center;
+  gap: 10px;
+}
+.feedback-incorrect {
+  background: #ffe0e0;
+  color: #c92a2a;
+  display: flex;
+  align-items: center;
+  gap: 10px;
+}
+.feedback-icon {
+  font-size: 24px;
+}
+.quiz-explanation {
+  margin-top: 15px;
+  padding: 15px;
+  background: #e5f5f9;
+  border-left: 4px solid #2ca25f;
+  border-radius: 6px;
+  color: #062b1e;
+}
+.quiz-results {
+  text-align: center;
+  padding: 40px 20px;
+}
+.results-icon {
+  font-size: 80px;
+  margin-bottom: 20px;
+}
+.results-score {
+  margin: 30px 0;
+}
+.score-circle {
+  position: relative;
+  display: inline-block;
+}
+.score-text {
+  position: absolute;
+  top: 50%;
+  left: 50%;
+  transform: translate(-50%, -50%);
+  text-align: center;
+}
+.score-percent {
+  font-size: 36px;
+  font-weight: bold;
+  color: #2ca25f;
+}
+.score-fraction {
+  font-size: 16px;
+  color: #666;
+}
+.results-message {
+  padding: 20px;
+  border-radius: 10px;
+  margin: 20px 0;
+  font-size: 18px;
+}
+.results-message.pass {
+  background: #d4f4dd;
+  color: #1e7d5a;
+}
+.results-message.fail {
+  background: #ffe0e0;
+  color: #c92a2a;
+}
+.results-details {
+  margin: 30px 0;
+  text-align: left;
+}
+.answers-list {
+  display: grid;
+  gap: 10px;
+  margin-top: 15px;
+}
+.answer-item {
+  display: flex;
+  align-items: center;
+  gap: 10px;
+  padding: 10px;
+  border-radius: 6px;
+}
+.answer-item.correct {
+  background: #d4f4dd;
+}
+.answer-item.incorrect {
+  background: #ffe0e0;
+}
+.answer-number {
+  font-weight: bold;
+  min-width: 30px;
+}
+.answer-icon {
+  font-size: 18px;
+}
+.answer-text {
+  flex: 1;
+  font-size: 14px;
+}
+.results-actions {
+  display: flex;
+  gap: 15px;
+  justify-content: center;
+  margin-top: 30px;
+}
+.retry-btn, .continue-btn {
+  padding: 15px 30px;
+  font-size: 16px;
+  font-weight: bold;
+  border: none;
+  border-radius: 8px;
+  cursor: pointer;
+  transition: all 0.2s;
+}
+.retry-btn {
+  background: #2ca25f;
+  color: white;
+}
+.retry-btn:hover {
+  background: #238b53;
+  transform: translateY(-2px);
+}
+.continue-btn {
+  background: #007bff;
+  color: white;
+}
+.continue-btn:hover {
+  background: #0056b3;
+  transform: translateY(-2px);
+}
+"""
+
+PAGE_JS = """// Add copy buttons to all code blocks (also called for lazily loaded sections)
+function addCopyButtons(root) {
+  const codeBlocks = root.querySelectorAll('pre');
+
+  codeBlocks.forEach(block => {
+    if (block.querySelector('.copy-btn')) return;
+    const button = document.createElement('button');
+    button.className = 'copy-btn';
+    button.textContent = 'Copiar';
+    button.setAttribute('aria-label', 'Copiar código');
+
+    button.addEventListener('click', async () => {
+      const code = block.querySelector('code');
+      const text = code ? code.textContent : block.textContent;
+
+      try {
+        await navigator.clipboard.writeText(text);
+        button.textContent = '✓ Copiado!';
+        button.classList.add('copied');
+
+        setTimeout(() => {
+          button.textContent = 'Copiar';
+          button.classList.remove('copied');
+        }, 2000);
+      } catch (err) {
+        button.textContent = '✗ Erro';
+        setTimeout(() => {
+          button.textContent = 'Copiar';
+        }, 2000);
+      }
+    });
+
+    block.style.position = 'relative';
+    block.appendChild(button);
+  });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+  addCopyButtons(document);
+});
+
+// Seções carregadas sob demanda (índices gerados com --lazy-sections).
+// Sem JavaScript, ou se o fragmento falhar, fica o link para a lição.
+document.addEventListener('DOMContentLoaded', function() {
+  const sections = document.querySelectorAll('section[data-fragment]');
+  if (sections.length === 0) return;
+
+  const load = section => {
+    if (section.dataset.loaded) return;
+    section.dataset.loaded = 'loading';
+    fetch(section.dataset.fragment)
+      .then(response => {
+        if (!response.ok) throw new Error(response.status);
+        return response.text();
+      })
+      .then(html => {
+        const body = section.querySelector('.section-body');
+        body.innerHTML = html;
+        addCopyButtons(body);
+        section.dataset.loaded = 'true';
+        section.dispatchEvent(new CustomEvent('section-loaded', { bubbles: true }));
+      })
+      .catch(() => {
+        section.dataset.loaded = 'error';
+      });
+  };
+
+  if (!('IntersectionObserver' in window)) {
+    sections.forEach(load);
+    return;
+  }
+  const observer = new IntersectionObserver(entries => {
+    entries.forEach(entry => {
+      if (entry.isIntersecting) {
+        observer.unobserve(entry.target);
+        load(entry.target);
+      }
+    });
+  }, { rootMargin: '800px 0px' });
+  sections.forEach(section => observer.observe(section));
+});
+
+// Tabs System
+document.addEventListener('DOMContentLoaded', function() {
+  const tabButtons = document.querySelectorAll('.tab-button');
+  const tabContents = document.querySelectorAll('.tab-content');
+
+  tabButtons.forEach((button, index) => {
+    button.addEventListener('click', () => {
+      // Remove active from all
+      tabButtons.forEach(btn => btn.classList.remove('active'));
+      tabContents.forEach(content => content.classList.remove('active'));
+
+      // Add active to clicked
+      button.classList.add('active');
+      tabContents[index].classList.add('active');
+    });
+  });
+
+  // Activate first tab by default
+  if (tabButtons.length > 0) {
+    tabButtons[0].classList.add('active');
+    tabContents[0].classList.add('active');
+  }
+});
+"""
+
 TEMPLATE = """<!doctype html>
 <html lang=\"pt-BR\">
   <head>
     <meta charset=\"utf-8\" />
     <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
     <title>{title}</title>
-    <style>
-      * {{ box-sizing: border-box; }}
-      body {{ 
-        margin: 0; 
-        background: linear-gradient(135deg, #e5f5f9 0%, #99d8c9 50%, #2ca25f 100%) !important;
-        min-height: 100vh;
-        color: #062b1e !important;
-        font-family: system-ui, -apple-system, sans-serif;
-        line-height: 1.6;
-      }}
-      header {{ 
-        background: linear-gradient(120deg, #2ca25f, #1e7d5a) !important;
-        color: #fff !important;
-        padding: 20px;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.2);
-      }}
-      header h1 {{ color: #fff !important; margin: 0; font-size: 1.8rem; }}
-      main {{ max-width: 1000px; margin: 24px auto; padding: 0 16px; }}
-      .module-content {{ display: grid; gap: 24px; }}
-      .module-section {{ 
-        background: #fff !important;
-        border: 3px solid #99d8c9 !important;
-        border-radius: 14px;
-        padding: 18px;
-        box-shadow: 0 16px 40px rgba(0,0,0,0.18);
-      }}
-      .module-section h2 {{ 
-        color: #2ca25f !important; 
-        border-left: 8px solid #2ca25f; 
-        padding-left: 12px;
-        margin-top: 0;
-      }}
-      .module-section h3 {{ color: #2ca25f !important; }}
-      .module-section p, .module-section li {{ color: #062b1e !important; }}
-      .module-section code {{ background: #e5f5f9 !important; padding: 2px 6px; border-radius: 4px; color: #062b1e; }}
-      .module-section pre {{ 
-        position: relative;
-        background: #1e1e1e !important; 
-        border-left: 6px solid #2ca25f !important;
-        padding: 14px 50px 14px 14px;
-        overflow-x: auto;
-        border-radius: 8px;
-        font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
-        font-size: 14px;
-        line-height: 1.5;
-      }}
-      .module-section pre code {{ 
-        background: transparent !important; 
-        color: #d4d4d4 !important; 
-        padding: 0; 
-      }}
-      
-      /* Copy Button */
-      .copy-btn {{
-        position: absolute;
-        top: 8px;
-        right: 8px;
-        background: #2ca25f !important;
-        color: #fff !important;
-        border: none;
-        border-radius: 6px;
-        padding: 6px 12px;
-        font-size: 12px;
-        font-weight: 700;
-        cursor: pointer;
-        transition: all 0.3s;
-        z-index: 10;
-      }}
-      .copy-btn:hover {{
-        background: #1e7d5a !important;
-        transform: scale(1.05);
-      }}
-      .copy-btn.copied {{
-        background: #4ec9b0 !important;
-      }}
-      
-      /* Syntax Highlighting - VS Code Dark Theme (FIXED CONTRAST) */
-      .codehilite {{ background: #1e1e1e !important; border-radius: 8px; }}
-      .codehilite .hll {{ background-color: #3e3e42; }}
-      .codehilite .c {{ color: #6a9955; font-style: italic; }} /* Comentarios */
-      .codehilite .k {{ color: #c586c0; font-weight: bold; }} /* Keywords (def, if, for) */
-      .codehilite .kn {{ color: #c586c0; }} /* import */
-      .codehilite .kt {{ color: #4ec9b0; }} /* tipos */
-      .codehilite .nc {{ color: #4ec9b0; }} /* Classes */
-      .codehilite .nf {{ color: #dcdcaa; }} /* Funcoes */
-      .codehilite .nb {{ color: #4ec9b0; }} /* Built-ins (print, len) */
-      .codehilite .s, .codehilite .s1, .codehilite .s2 {{ color: #ce9178; }} /* Strings */
-      .codehilite .si {{ color: #d7ba7d; }} /* String interpolation */
-      .codehilite .m, .codehilite .mi, .codehilite .mf {{ color: #b5cea8; }} /* Numeros */
-      .codehilite .o {{ color: #d4d4d4; }} /* Operadores */
-      .codehilite .ow {{ color: #c586c0; }} /* Operadores palavra (and, or) */
-      .codehilite .n {{ color: #9cdcfe; }} /* Variaveis */
-      .codehilite .na {{ color: #9cdcfe; }} /* Atributos */
-      .codehilite .bp {{ color: #c586c0; }} /* self */
-      .codehilite .err {{ color: #f48771; background: transparent; }} /* Erros - SEM fundo preto */
-      .codehilite .fm {{ color: #dcdcaa; }} /* Magic methods */
-      .codehilite .nn {{ color: #4ec9b0; }} /* Namespace */
-      .codehilite .p {{ color: #d4d4d4; }} /* Pontuacao - cinza claro ao inves de preto */
-      .codehilite .w {{ color: #d4d4d4; }} /* Whitespace */
-      
-      /* Garantir que NADA seja preto em blocos de codigo */
-      pre, pre *, .codehilite, .codehilite * {{
-        color: #d4d4d4 !important;
-      }}
-      
-      /* Reaplica cores especificas por cima da regra geral */
-      .codehilite .c {{ color: #6a9955 !important; font-style: italic; }}
-      .codehilite .k {{ color: #c586c0 !important; font-weight: bold; }}
-      .codehilite .kn {{ color: #c586c0 !important; }}
-      .codehilite .kt {{ color: #4ec9b0 !important; }}
-      .codehilite .nc {{ color: #4ec9b0 !important; }}
-      .codehilite .nf {{ color: #dcdcaa !important; }}
-      .codehilite .nb {{ color: #4ec9b0 !important; }}
-      .codehilite .s, .codehilite .s1, .codehilite .s2 {{ color: #ce9178 !important; }}
-      .codehilite .si {{ color: #d7ba7d !important; }}
-      .codehilite .m, .codehilite .mi, .codehilite .mf {{ color: #b5cea8 !important; }}
-      .codehilite .o {{ color: #d4d4d4 !important; }}
-      .codehilite .ow {{ color: #c586c0 !important; }}
-      .codehilite .n {{ color: #9cdcfe !important; }}
-      .codehilite .na {{ color: #9cdcfe !important; }}
-      .codehilite .bp {{ color: #c586c0 !important; }}
-      .codehilite .err {{ color: #f48771 !important; background: transparent !important; }}
-      .codehilite .fm {{ color: #dcdcaa !important; }}
-      .codehilite .nn {{ color: #4ec9b0 !important; }}
-      .codehilite .p {{ color: #d4d4d4 !important; }}
-      .codehilite .w {{ color: #d4d4d4 !important; }}
-      
-      /* Tabs System */
-      .tabs-container {{ margin: 20px 0; }}
-      .tabs-nav {{
-        display: flex;
-        gap: 8px;
-        flex-wrap: wrap;
-        background: rgba(255,255,255,0.3);
-        padding: 12px;
-        border-radius: 12px 12px 0 0;
-        border-bottom: 3px solid #2ca25f;
-      }}
-      .tab-button {{
-        background: #fff;
-        color: #2ca25f;
-        border: 2px solid #99d8c9;
-        border-radius: 8px;
-        padding: 10px 18px;
-        cursor: pointer;
-        font-weight: 700;
-        font-size: 15px;
-        transition: all 0.3s;
-      }}
-      .tab-button:hover {{
-        background: #e5f5f9;
-        transform: translateY(-2px);
-      }}
-      .tab-button.active {{
-        background: #2ca25f !important;
-        color: #fff !important;
-        border-color: #1e7d5a;
-        box-shadow: 0 4px 12px rgba(44, 162, 95, 0.3);
-      }}
-      .tab-content {{
-        display: none;
-        background: #fff;
-        border: 3px solid #99d8c9;
-        border-top: none;
-        border-radius: 0 0 14px 14px;
-        padding: 24px;
-        animation: fadeIn 0.3s;
-      }}
-      .tab-content.active {{
-        display: block;
-      }}
-      @keyframes fadeIn {{
-        from {{ opacity: 0; transform: translateY(-10px); }}
-        to {{ opacity: 1; transform: translateY(0); }}
-      }}
-      
-      .hero {{
-        background: linear-gradient(120deg, #99d8c9, #2ca25f) !important;
-        border: 3px solid #1e7d5a !important;
-        border-left: 12px solid #1e7d5a !important;
-        border-radius: 14px;
-        padding: 24px;
-        margin-bottom: 28px;
-        box-shadow: 0 16px 40px rgba(0,0,0,0.18);
-      }}
-      .hero h2 {{ margin: 0 0 12px; color: #fff !important; font-size: 2rem; }}
-      .hero h3 {{ margin: 16px 0 10px; color: #fff !important; font-size: 1.4rem; }}
-      .hero p {{ color: #fff !important; font-size: 1.08rem; }}
-      .hero ul {{ margin: 10px 0; padding-left: 24px; color: #fff !important; }}
-      .hero li {{ color: #fff !important; margin: 6px 0; }}
-      .chips {{ display: flex; flex-wrap: wrap; gap: 10px; margin-top: 14px; }}
-      .chip {{
-        background: #1e7d5a !important;
-        color: #fff !important;
-        border: 2px solid #156048 !important;
-        border-radius: 999px;
-        padding: 9px 14px;
-        font-weight: 700;
-        font-size: 0.92rem;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.15);
-      }}
-      
-      /* Module TOC Summary */
-      .module-toc-summary {{
-        background: linear-gradient(135deg, #fff 0%, #e5f5f9 100%);
-        border: 3px solid #2ca25f;
-        border-left: 12px solid #2ca25f;
-        border-radius: 14px;
-        padding: 24px;
-        margin: 24px 0;
-        box-shadow: 0 8px 24px rgba(0,0,0,0.12);
-      }}
-      .module-toc-summary h2 {{
-        color: #2ca25f !important;
-        margin: 0 0 16px;
-        font-size: 1.5rem;
-        border: none !important;
-        padding: 0 !important;
-      }}
-      .toc-list {{
-        list-style: none;
-        padding: 0;
-        margin: 0;
-        display: grid;
-        gap: 12px;
-      }}
-      .toc-item {{
-        background: #fff;
-        border: 2px solid #99d8c9;
-        border-radius: 10px;
-        transition: all 0.3s;
-      }}
-      .toc-item:hover {{
-        border-color: #2ca25f;
-        transform: translateX(8px);
-        box-shadow: 0 4px 12px rgba(44, 162, 95, 0.2);
-      }}
-      .toc-link {{
-        display: block;
-        padding: 16px;
-        text-decoration: none;
-        color: inherit;
-      }}
-      .toc-link strong {{
-        display: block;
-        color: #2ca25f !important;
-        font-size: 1.1rem;
-        margin-bottom: 6px;
-      }}
-      .toc-preview {{
-        display: block;
-        color: #555 !important;
-        font-size: 0.9rem;
-        line-height: 1.4;
-      }}
-      
-      footer {{ max-width: 1000px; margin: 24px auto; padding: 0 16px 24px; color: #333; text-align: center; }}
-      
-      /* ===== PROGRESS TRACKING STYLES ===== */
-      .progress-container {{
-        background: #e5f5f9;
-        padding: 20px;
-        border-radius: 10px;
-        margin-bottom: 30px;
-        border: 2px solid #99d8c9;
-      }}
-      .progress-header {{
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        margin-bottom: 15px;
-      }}
-      .progress-header h3 {{
-        margin: 0;
-        color: #2ca25f !important;
-      }}
-      .reset-progress-btn {{
-        background: #ff6b6b;
-        color: white;
-        border: none;
-        padding: 8px 16px;
-        border-radius: 6px;
-        cursor: pointer;
-        font-size: 14px;
-        transition: all 0.2s;
-      }}
-      .reset-progress-btn:hover {{
-        background: #ee5a52;
-        transform: translateY(-2px);
-      }}
-      .progress-bar-container {{
-        background: white;
-        height: 40px;
-        border-radius: 20px;
-        overflow: hidden;
-        border: 2px solid #99d8c9;
-      }}
-      .module-progress-bar {{
-        height: 100%;
-        background: linear-gradient(90deg, #2ca25f, #10a05d);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        color: white;
-        font-weight: bold;
-        font-size: 14px;
-        transition: width 0.5s ease;
-        min-width: 80px;
-      }}
-      .lesson-checkbox {{
-        width: 20px;
-        height: 20px;
-        cursor: pointer;
-        accent-color: #2ca25f;
-      }}
-      .lesson-checkbox-container {{
-        vertical-align: middle;
-      }}
-      
-      /* ===== SEARCH STYLES ===== */
-      .search-bar {{
-        background: white;
-        padding: 20px;
-        border-radius: 10px;
-        margin-bottom: 20px;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-        border: 2px solid #99d8c9;
-      }}
-      .search-input-container {{
-        position: relative;
-        display: flex;
-        align-items: center;
-      }}
-      #searchInput {{
-        width: 100%;
-        padding: 14px 50px 14px 16px;
-        font-size: 16px;
-        border: 2px solid #2ca25f;
-        border-radius: 8px;
-        outline: none;
-        transition: all 0.2s;
-      }}
-      #searchInput:focus {{
-        border-color: #238b53;
-        box-shadow: 0 0 0 3px rgba(44, 162, 95, 0.1);
-      }}
-      .clear-search-btn {{
-        position: absolute;
-        right: 10px;
-        background: transparent;
-        border: none;
-        font-size: 20px;
-        cursor: pointer;
-        color: #999;
-        padding: 5px 10px;
-        transition: color 0.2s;
-      }}
-      .clear-search-btn:hover {{
-        color: #ff6b6b;
-      }}
-      .search-results {{
-        margin-top: 15px;
-        max-height: 400px;
-        overflow-y: auto;
-        border-radius: 8px;
-      }}
-      .results-header {{
-        background: #e5f5f9;
-        padding: 10px 15px;
-        font-weight: bold;
-        color: #2ca25f;
-        border-radius: 6px 6px 0 0;
-      }}
-      .search-result-item {{
-        padding: 12px 15px;
-        border-bottom: 1px solid #eee;
-        cursor: pointer;
-        transition: all 0.2s;
-      }}
-      .search-result-item:hover {{
-        background: #f7fafc;
-        border-left: 4px solid #2ca25f;
-      }}
-      .result-type {{
-        font-size: 11px;
-        color: #999;
-        text-transform: uppercase;
-        margin-bottom: 5px;
-      }}
-      .result-text {{
-        margin-bottom: 5px;
-        line-height: 1.5;
-      }}
-      .result-text mark {{
-        background: #ffeb3b;
-        padding: 2px 4px;
-        border-radius: 3px;
-      }}
-      .result-module {{
-        font-size: 12px;
-        color: #666;
-      }}
-      .no-results {{
-        padding: 20px;
-        text-align: center;
-        color: #999;
-      }}
-      .search-highlight {{
-        background: #ffeb3b !important;
-        padding: 4px;
-        border-radius: 4px;
-        transition: background 0.3s;
-      }}
-      .search-highlight-active {{
-        background: #ffc107 !important;
-        animation: pulse 0.5s ease;
-      }}
-      @keyframes pulse {{
-        0%, 100% {{ transform: scale(1); }}
-        50% {{ transform: scale(1.05); }}
-      }}
-      
-      /* ===== QUIZ STYLES ===== */
-      .quiz-card {{
-        background: white;
-        padding: 30px;
-        border-radius: 12px;
-        box-shadow: 0 8px 24px rgba(0,0,0,0.15);
-        border: 2px solid #99d8c9;
-        margin: 20px 0;
-      }}
-      .quiz-progress-bar {{
-        height: 8px;
-        background: #e0e0e0;
-        border-radius: 4px;
-        margin-bottom: 20px;
-        overflow: hidden;
-      }}
-      .quiz-progress-fill {{
-        height: 100%;
-        background: linear-gradient(90deg, #2ca25f, #10a05d);
-        transition: width 0.5s ease;
-      }}
-      .quiz-header {{
-        display: flex;
-        justify-content: space-between;
-        margin-bottom: 20px;
-        font-size: 14px;
-      }}
-      .quiz-counter {{
-        color: #666;
-        font-weight: 500;
-      }}
-      .quiz-score {{
-        color: #2ca25f;
-        font-weight: bold;
-      }}
-      .quiz-question {{
-        color: #2ca25f !important;
-        font-size: 1.3rem;
-        margin-bottom: 20px;
-      }}
-      .quiz-code {{
-        background: #1e1e1e !important;
-        color: #d4d4d4 !important;
-        padding: 15px;
-        border-radius: 8px;
-        margin: 15px 0;
-        font-family: 'Consolas', monospace;
-      }}
-      .quiz-options {{
-        display: grid;
-        gap: 12px;
-        margin: 20px 0;
-      }}
-      .quiz-option {{
-        display: flex;
-        align-items: center;
-        padding: 15px;
-        background: #f7fafc;
-        border: 2px solid #e2e8f0;
-        border-radius: 10px;
-        cursor: pointer;
-        text-align: left;
-        font-size: 16px;
-        transition: all 0.2s;
-        gap: 12px;
-      }}
-      .quiz-option:hover:not(.disabled) {{
-        background: #e5f5f9;
-        border-color: #2ca25f;
-        transform: translateX(5px);
-      }}
-      .quiz-option.disabled {{
-        cursor: not-allowed;
-        opacity: 0.7;
-      }}
-      .quiz-option.correct {{
-        background: #d4f4dd;
-        border-color: #2ca25f;
-        border-width: 3px;
-      }}
-      .quiz-option.incorrect {{
-        background: #ffe0e0;
-        border-color: #ff6b6b;
-        border-width: 3px;
-      }}
-      .option-letter {{
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        min-width: 32px;
-        height: 32px;
-        background: #2ca25f;
-        color: white;
-        border-radius: 50%;
-        font-weight: bold;
-        font-size: 14px;
-      }}
-      .quiz-option.correct .option-letter {{
-        background: #10a05d;
-      }}
-      .quiz-option.incorrect .option-letter {{
-        background: #ff6b6b;
-      }}
-      .option-text {{
-        flex: 1;
-      }}
-      .quiz-feedback {{
-        margin-top: 20px;
-        padding: 15px;
-        border-radius: 8px;
-        font-size: 16px;
-        font-weight: 500;
-      }}
-      .feedback-correct {{
-        background: #d4f4dd;
-        color: #1e7d5a;
-        display: flex;
-        align-items: center;
-        gap: 10px;
-      }}
-      .feedback-incorrect {{
-        background: #ffe0e0;
-        color: #c92a2a;
-        display: flex;
-        align-items: center;
-        gap: 10px;
-      }}
-      .feedback-icon {{
-        font-size: 24px;
-      }}
-      .quiz-explanation {{
-        margin-top: 15px;
-        padding: 15px;
-        background: #e5f5f9;
-        border-left: 4px solid #2ca25f;
-        border-radius: 6px;
-        color: #062b1e;
-      }}
-      .quiz-results {{
-        text-align: center;
-        padding: 40px 20px;
-      }}
-      .results-icon {{
-        font-size: 80px;
-        margin-bottom: 20px;
-      }}
-      .results-score {{
-        margin: 30px 0;
-      }}
-      .score-circle {{
-        position: relative;
-        display: inline-block;
-      }}
-      .score-text {{
-        position: absolute;
-        top: 50%;
-        left: 50%;
-        transform: translate(-50%, -50%);
-        text-align: center;
-      }}
-      .score-percent {{
-        font-size: 36px;
-        font-weight: bold;
-        color: #2ca25f;
-      }}
-      .score-fraction {{
-        font-size: 16px;
-        color: #666;
-      }}
-      .results-message {{
-        padding: 20px;
-        border-radius: 10px;
-        margin: 20px 0;
-        font-size: 18px;
-      }}
-      .results-message.pass {{
-        background: #d4f4dd;
-        color: #1e7d5a;
-      }}
-      .results-message.fail {{
-        background: #ffe0e0;
-        color: #c92a2a;
-      }}
-      .results-details {{
-        margin: 30px 0;
-        text-align: left;
-      }}
-      .answers-list {{
-        display: grid;
-        gap: 10px;
-        margin-top: 15px;
-      }}
-      .answer-item {{
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        padding: 10px;
-        border-radius: 6px;
-      }}
-      .answer-item.correct {{
-        background: #d4f4dd;
-      }}
-      .answer-item.incorrect {{
-        background: #ffe0e0;
-      }}
-      .answer-number {{
-        font-weight: bold;
-        min-width: 30px;
-      }}
-      .answer-icon {{
-        font-size: 18px;
-      }}
-      .answer-text {{
-        flex: 1;
-        font-size: 14px;
-      }}
-      .results-actions {{
-        display: flex;
-        gap: 15px;
-        justify-content: center;
-        margin-top: 30px;
-      }}
-      .retry-btn, .continue-btn {{
-        padding: 15px 30px;
-        font-size: 16px;
-        font-weight: bold;
-        border: none;
-        border-radius: 8px;
-        cursor: pointer;
-        transition: all 0.2s;
-      }}
-      .retry-btn {{
-        background: #2ca25f;
-        color: white;
-      }}
-      .retry-btn:hover {{
-        background: #238b53;
-        transform: translateY(-2px);
-      }}
-      .continue-btn {{
-        background: #007bff;
-        color: white;
-      }}
-      .continue-btn:hover {{
-        background: #0056b3;
-        transform: translateY(-2px);
-      }}
-    </style>
+    <link rel="stylesheet" href="{assets}/{page_css}" />
   </head>
   <body class=\"{body_class}\">
     <header role=\"banner\">
@@ -724,77 +881,12 @@ TEMPLATE = """<!doctype html>
         {content}
       </article>
     </main>
-    <footer role=\"contentinfo\">
-      <p>Gerado automaticamente em {date}. Paleta: ColorBrewer BuGn.</p>
-    </footer>
-    
     <!-- External JavaScript Files -->
-    <script src="../../assets/progress.js"></script>
-    <script src="../../assets/search.js"></script>
-    <script src="../../assets/quiz.js"></script>
-    
-    <script>
-      // Add copy buttons to all code blocks
-      document.addEventListener('DOMContentLoaded', function() {{
-        const codeBlocks = document.querySelectorAll('pre');
-        
-        codeBlocks.forEach(block => {{
-          const button = document.createElement('button');
-          button.className = 'copy-btn';
-          button.textContent = 'Copiar';
-          button.setAttribute('aria-label', 'Copiar código');
-          
-          button.addEventListener('click', async () => {{
-            const code = block.querySelector('code');
-            const text = code ? code.textContent : block.textContent;
-            
-            try {{
-              await navigator.clipboard.writeText(text);
-              button.textContent = '✓ Copiado!';
-              button.classList.add('copied');
-              
-              setTimeout(() => {{
-                button.textContent = 'Copiar';
-                button.classList.remove('copied');
-              }}, 2000);
-            }} catch (err) {{
-              button.textContent = '✗ Erro';
-              setTimeout(() => {{
-                button.textContent = 'Copiar';
-              }}, 2000);
-            }}
-          }});
-          
-          block.style.position = 'relative';
-          block.appendChild(button);
-        }});
-      }});
-      
-      // Tabs System
-      document.addEventListener('DOMContentLoaded', function() {{
-        const tabButtons = document.querySelectorAll('.tab-button');
-        const tabContents = document.querySelectorAll('.tab-content');
-        
-        tabButtons.forEach((button, index) => {{
-          button.addEventListener('click', () => {{
-            // Remove active from all
-            tabButtons.forEach(btn => btn.classList.remove('active'));
-            tabContents.forEach(content => content.classList.remove('active'));
-            
-            // Add active to clicked
-            button.classList.add('active');
-            tabContents[index].classList.add('active');
-          }});
-        }});
-        
-        // Activate first tab by default
-        if (tabButtons.length > 0) {{
-          tabButtons[0].classList.add('active');
-          tabContents[0].classList.add('active');
-        }}
-      }});
-    </script>
-    <script src=\"{assets}/site.js\"></script>
+    <script src="{assets}/{progress_js}"></script>
+    <script src="{assets}/{search_js}"></script>
+    <script src="{assets}/{quiz_js}"></script>
+    <script src="{assets}/{page_js}"></script>
+    <script src=\"{assets}/{site_js}\"></script>
   </body>
 </html>
 """
@@ -803,46 +895,1116 @@ TEMPLATE = """<!doctype html>
 def ensure_dirs():
     OUT.mkdir(parents=True, exist_ok=True)
     ASSETS.mkdir(parents=True, exist_ok=True)
+    write_page_assets()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def fingerprint(name: str, content: str) -> str:
+    # page.css -> page.<hash>.css
+    stem, ext = name.rsplit('.', 1)
+    return f"{stem}.{text_hash(content)[:10]}.{ext}"
+
+
+# ---------------------------------------------------------------------------
+# Minificação (--minify)
+#
+# Conservadora de propósito: nada de renomear variáveis ou reescrever
+# expressões. Conteúdo de <pre>, <code>, <textarea> e de strings/regex em JS
+# é copiado byte a byte.
+# ---------------------------------------------------------------------------
+
+_WS_RUN = re.compile(r"\s+")
+_HTML_VERBATIM = re.compile(r"(<(pre|code|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)",
+                            re.IGNORECASE | re.DOTALL)
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void',
+                      'delete', 'throw', 'new', 'instanceof', 'yield', 'await'}
+
+
+def _collapse_ws(match: re.Match) -> str:
+    # uma quebra de linha basta para separar; espaços viram um só
+    return '\n' if '\n' in match.group(0) else ' '
+
+
+def _skip_quoted(src: str, i: int) -> int:
+    """Índice logo após a string (ou template literal) que começa em src[i]."""
+    quote = src[i]
+    i += 1
+    while i < len(src):
+        c = src[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == quote:
+            return i + 1
+        if quote == '`' and src.startswith('${', i):
+            i = _skip_braces(src, i + 1)
+            continue
+        i += 1
+    return i
+
+
+def _skip_braces(src: str, i: int) -> int:
+    # src[i] == '{': avança até a chave correspondente, pulando strings
+    depth = 0
+    while i < len(src):
+        c = src[i]
+        if c in '"\'`':
+            i = _skip_quoted(src, i)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _skip_regex(src: str, i: int) -> int:
+    in_class = False
+    i += 1
+    while i < len(src) and src[i] != '\n':
+        c = src[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            while i < len(src) and (src[i].isalnum() or src[i] == '_'):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def _is_ident(c: str) -> bool:
+    return c.isalnum() or c in '_$' or ord(c) > 127
+
+
+def minify_js(src: str) -> str:
+    """Remove comentários e espaços redundantes de um script.
+
+    As quebras de linha são mantidas onde podem ser significativas (inserção
+    automática de ponto e vírgula); strings, templates e regex ficam intactos.
+    """
+    out: list[str] = []
+    i, n = 0, len(src)
+
+    def last() -> str:
+        return out[-1][-1] if out else ''
+
+    def regex_allowed() -> bool:
+        prev = last()
+        if not prev or prev in '(,=:[!&|?{};+-*%<>~^\n':
+            return True
+        if _is_ident(prev):
+            word = re.search(r"[\w$]+$", ''.join(out[-12:]))
+            return bool(word) and word.group(0) in _JS_REGEX_KEYWORDS
+        return False
+
+    while i < n:
+        c = src[i]
+        if c in '"\'`':
+            j = _skip_quoted(src, i)
+            out.append(src[i:j])
+            i = j
+        elif src.startswith('//', i):
+            i = src.find('\n', i)
+            i = n if i < 0 else i
+        elif src.startswith('/*', i):
+            j = src.find('*/', i + 2)
+            i = n if j < 0 else j + 2
+            if last() and _is_ident(last()) and i < n and _is_ident(src[i]):
+                out.append(' ')
+        elif c == '/' and regex_allowed():
+            j = _skip_regex(src, i)
+            out.append(src[i:j])
+            i = j
+        elif c.isspace():
+            j = i
+            while j < n and src[j].isspace():
+                j += 1
+            prev, nxt = last(), src[j] if j < n else ''
+            if not prev or not nxt:
+                pass
+            elif '\n' in src[i:j]:
+                if prev not in '{;,([\n' and nxt not in ')]};,.':
+                    out.append('\n')
+            elif (_is_ident(prev) and _is_ident(nxt)) or (prev in '+-' and nxt in '+-'):
+                out.append(' ')
+            i = j
+        else:
+            out.append(c)
+            i += 1
+    return ''.join(out).strip() + '\n'
+
+
+def _split_css(text: str, sep: str) -> list[str]:
+    # divide em `sep` fora de parênteses e strings (url(data:...;...))
+    parts, depth, start, i = [], 0, 0, 0
+    while i < len(text):
+        c = text[i]
+        if c in '"\'':
+            i = _skip_quoted(text, i)
+            continue
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _parse_css(text: str) -> list:
+    """Lista de regras: (seletor, [declarações]) ou (at-rule, [regras])/(at-rule, None)."""
+    items, i, start = [], 0, 0
+    while i < len(text):
+        c = text[i]
+        if c in '"\'':
+            i = _skip_quoted(text, i)
+            continue
+        if c == ';' and text[start:i].strip().startswith('@'):
+            items.append((text[start:i].strip(), None))
+            start = i + 1
+        elif c == '{':
+            end = _skip_braces(text, i)
+            head = _WS_RUN.sub(' ', text[start:i]).strip()
+            body = text[i + 1:end - 1]
+            if head.startswith('@'):
+                nested = head.split(' ', 1)[0] in ('@media', '@supports', '@layer', '@document')
+                items.append((head, _parse_css(body) if nested else _WS_RUN.sub(' ', body).strip()))
+            else:
+                head = re.sub(r"\s*([,>])\s*", r"\1", head)
+                decls = [_WS_RUN.sub(' ', d).strip() for d in _split_css(body, ';')]
+                decls = [re.sub(r"\s*!\s*important$", "!important", d) for d in decls if d]
+                items.append((head, [re.sub(r"^([\w-]+)\s*:\s*", r"\1:", d) for d in decls]))
+            i = start = end
+            continue
+        i += 1
+    return items
+
+
+def _dedupe_css(items: list) -> list:
+    """Remove declarações que uma regra posterior com o mesmo seletor sobrescreve.
+
+    Mesmo seletor = mesma especificidade, então vence a última ocorrência,
+    a menos que só a anterior seja !important. Regras que ficam vazias somem
+    (inclusive as idênticas repetidas).
+    """
+    later: dict[str, dict[str, bool]] = {}
+    kept = []
+    for head, body in reversed(items):
+        if isinstance(body, list) and not head.startswith('@'):
+            seen = later.setdefault(head, {})
+            remaining = []
+            for decl in body:
+                prop, _, value = decl.partition(':')
+                important = value.replace(' ', '').endswith('!important')
+                if prop in seen and (seen[prop] or not important):
+                    continue
+                remaining.append(decl)
+            for decl in remaining:
+                prop, _, value = decl.partition(':')
+                seen[prop] = seen.get(prop, False) or value.replace(' ', '').endswith('!important')
+            if not remaining:
+                continue
+            body = remaining
+        elif isinstance(body, list):
+            body = _dedupe_css(body)
+        kept.append((head, body))
+    return kept[::-1]
+
+
+def _render_css(items: list) -> str:
+    parts = []
+    for head, body in items:
+        if body is None:
+            parts.append(head + ';')
+        elif isinstance(body, str):
+            parts.append(f"{head}{{{body}}}")
+        elif head.startswith('@'):
+            parts.append(f"{head}{{{_render_css(body)}}}")
+        else:
+            parts.append(f"{head}{{{';'.join(body)}}}")
+    return '\n'.join(parts)
+
+
+def minify_css(css: str) -> str:
+    """Remove comentários e espaços e descarta regras sobrescritas por completo."""
+    out, i = [], 0
+    while i < len(css):
+        if css[i] in '"\'':
+            j = _skip_quoted(css, i)
+            out.append(css[i:j])
+            i = j
+        elif css.startswith('/*', i):
+            j = css.find('*/', i + 2)
+            i = len(css) if j < 0 else j + 2
+        else:
+            out.append(css[i])
+            i += 1
+    return _render_css(_dedupe_css(_parse_css(''.join(out)))) + '\n'
+
+
+def minify_html(html: str) -> str:
+    """Colapsa espaços fora de <pre>, <code> e <textarea>; minifica <style>/<script> inline."""
+    parts, pos = [], 0
+    for match in _HTML_VERBATIM.finditer(html):
+        parts.append(_WS_RUN.sub(_collapse_ws, html[pos:match.start()]))
+        open_tag, tag, inner, close_tag = match.groups()
+        tag = tag.lower()
+        if tag == 'style':
+            inner = minify_css(inner).strip()
+        elif tag == 'script' and inner.strip():
+            inner = minify_js(inner).strip()
+        parts.append(_WS_RUN.sub(' ', open_tag) + inner + close_tag)
+        pos = match.end()
+    parts.append(_WS_RUN.sub(_collapse_ws, html[pos:]))
+    return ''.join(parts)
+
+
+def minify_asset(name: str, content: str) -> str:
+    return minify_css(content) if name.endswith('.css') else minify_js(content)
+
+
+# scripts mantidos à mão em docs/assets; com --minify o template passa a
+# carregar cópias minificadas com fingerprint
+SOURCE_ASSETS = ['progress.js', 'search.js', 'quiz.js', 'site.js']
+MINIFY = False
+# índices de módulo com as seções em fragmentos carregados sob demanda
+LAZY_SECTIONS = False
+SECTIONS_DIR = "_sections"
+
+
+def page_assets(minify: bool = False) -> dict[str, str]:
+    assets = {'page.css': PAGE_CSS + add_dark_mode_footer.DARK_MODE_CSS, 'page.js': PAGE_JS}
+    if not minify:
+        return assets
+    for name in SOURCE_ASSETS:
+        if (ASSETS / name).exists():
+            assets[name] = (ASSETS / name).read_text(encoding='utf-8')
+    return {name: minify_asset(name, content) for name, content in assets.items()}
+
+
+def asset_files(assets: dict[str, str]) -> dict[str, str]:
+    files = {name: name for name in SOURCE_ASSETS}
+    files.update((name, fingerprint(name, content)) for name, content in assets.items())
+    return files
+
+
+# nome lógico -> nome com fingerprint, referenciado pelo TEMPLATE
+PAGE_ASSETS = page_assets()
+ASSET_FILES = asset_files(PAGE_ASSETS)
+
+
+def set_minify(enabled: bool):
+    """Liga/desliga a minificação do HTML e dos assets (--minify)."""
+    global MINIFY, PAGE_ASSETS, ASSET_FILES
+    MINIFY = enabled
+    PAGE_ASSETS = page_assets(enabled)
+    ASSET_FILES = asset_files(PAGE_ASSETS)
+
+
+def write_page_assets():
+    """Grava os assets com fingerprint em docs/assets e remove versões antigas."""
+    for name, content in PAGE_ASSETS.items():
+        target = ASSETS / ASSET_FILES[name]
+        if not target.exists():
+            target.write_text(content, encoding='utf-8')
+    for name, target in ASSET_FILES.items():
+        stem, ext = name.rsplit('.', 1)
+        for old in ASSETS.glob(f"{stem}.*.{ext}"):
+            if old.name != target:
+                old.unlink()
+
+
+def _dark_mode(html: str) -> str:
+    # o CSS do dark mode já faz parte do page.css
+    return add_dark_mode_footer.inject_dark_mode_and_footer(html, include_css=False)
+
+
+# Transformações aplicadas, nesta ordem, ao HTML final antes da gravação.
+# Substituem as passadas de add_dark_mode_footer.py, remove_old_footer.py e
+# fix_encoding.py sobre docs/html.
+POSTPROCESSORS = [
+    _dark_mode,
+    remove_old_footer.strip_old_footer,
+    fix_encoding.fix_encoding,
+]
+
+
+def postprocess(html: str) -> str:
+    for transform in POSTPROCESSORS:
+        html = transform(html)
+    # por último, para não esconder dos passos acima os trechos que procuram
+    return minify_html(html) if MINIFY else html
+
+
+# Marca o ponto do conteúdo no "casco" da página (template sem o conteúdo).
+# Dark mode e rodapé só mexem no casco; o conteúdo, gravado em pedaços, passa
+# apenas pelas transformações que agem trecho a trecho.
+CONTENT_MARKER = "<!--@conteudo@-->"
+
+
+def postprocess_chunk(chunk: str) -> str:
+    chunk = fix_encoding.fix_encoding(chunk)
+    return minify_html(chunk) if MINIFY else chunk
+
+
+def build_signature() -> dict:
+    # tudo que, além do .md, muda o HTML gerado
+    ext_config = json.dumps([MD_EXTS, markdown.__version__, pygments.__version__])
+    postprocess_sources = ''.join(
+        Path(module.__file__).read_text(encoding='utf-8')
+        for module in (add_dark_mode_footer, remove_old_footer, fix_encoding)
+    )
+    return {
+        # o próprio gerador: marcação do índice do módulo, slugify, hero...
+        'builder': file_hash(Path(__file__)),
+        'template': text_hash(TEMPLATE + json.dumps(ASSET_FILES, sort_keys=True)),
+        'extensions': text_hash(ext_config),
+        'postprocess': text_hash(postprocess_sources + f'minify={MINIFY} lazy={LAZY_SECTIONS}'),
+    }
+
+
+class BuildManifest:
+    """Registro persistente do que gerou cada arquivo de saída.
+
+    Cada entrada (chave: caminho de saída relativo a ROOT) guarda o hash de
+    cada .md de origem e a assinatura do template/extensões usada no build.
+    """
+
+    def __init__(self, path: Path, entries: dict | None = None):
+        self.path = path
+        self.entries = entries or {}
+        self.signature = build_signature()
+
+    @classmethod
+    def load(cls, path: Path) -> "BuildManifest":
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get('version') != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get('entries', {}))
+
+    def is_fresh(self, out_path: Path, sources: dict[str, str]) -> bool:
+        entry = self.entries.get(out_path.relative_to(ROOT).as_posix())
+        return (
+            entry is not None
+            and out_path.exists()
+            and entry['sources'] == sources
+            and all(entry.get(key) == value for key, value in self.signature.items())
+        )
+
+    def signature_changed(self) -> bool:
+        # alguma saída registrada foi gerada com outro template, assets ou opções
+        return any(
+            any(entry.get(key) != value for key, value in self.signature.items())
+            for entry in self.entries.values()
+        )
+
+    def record(self, out_path: Path, sources: dict[str, str], **extra):
+        self.entries[out_path.relative_to(ROOT).as_posix()] = {
+            'sources': sources,
+            **self.signature,
+            **extra,
+        }
+
+    def get(self, out_path: Path) -> dict | None:
+        return self.entries.get(out_path.relative_to(ROOT).as_posix())
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {'version': MANIFEST_VERSION, 'entries': self.entries}
+        self.path.write_text(json.dumps(data, indent=1, sort_keys=True), encoding='utf-8')
+
+
+class HighlightCache:
+    """Cache em disco do HTML gerado pelo Pygments, endereçado pelo conteúdo.
+
+    Cada bloco fica em <dir>/<2 primeiros hex>/<sha256>.html. A data de
+    modificação é atualizada a cada acerto, e prune() remove os blocos menos
+    usados recentemente até o total caber em `max_bytes`.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = HIGHLIGHT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.html"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            html = path.read_text(encoding='utf-8')
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return html
+
+    def put(self, key: str, html: str):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # grava em arquivo temporário e renomeia: processos do pool podem
+        # gravar a mesma chave ao mesmo tempo
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(html, encoding='utf-8')
+        os.replace(tmp, path)
+
+    def prune(self) -> int:
+        """Remove os blocos mais antigos além do limite; devolve quantos saíram."""
+        entries = []
+        for path in self.directory.glob('*/*.html'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+
+# cache usado pelos blocos de código; None desliga o cache
+_HIGHLIGHT_CACHE: HighlightCache | None = HighlightCache(HIGHLIGHT_CACHE_DIR)
+
+
+class CachedCodeHilite(codehilite.CodeHilite):
+    """CodeHilite que consulta o HighlightCache antes de chamar o Pygments."""
+
+    def hilite(self, shebang: bool = True) -> str:
+        cache = _HIGHLIGHT_CACHE
+        if cache is None:
+            return super().hilite(shebang)
+        formatter = self.pygments_formatter
+        key_data = json.dumps([
+            self.lang, self.src.strip('\n'), shebang, self.guess_lang, self.use_pygments,
+            self.lang_prefix, formatter if isinstance(formatter, str) else repr(formatter),
+            self.options, pygments.__version__, markdown.__version__,
+        ], sort_keys=True, default=repr)
+        key = text_hash(key_data)
+        html = cache.get(key)
+        if html is None:
+            html = super().hilite(shebang)
+            cache.put(key, html)
+        return html
+
+
+# fenced_code e codehilite instanciam CodeHilite pelo nome do módulo, sem
+# ponto de extensão; trocamos a classe nos dois lugares
+fenced_code.CodeHilite = CachedCodeHilite
+codehilite.CodeHilite = CachedCodeHilite
+
+
+class PageOutline:
+    """O que a conversão de uma página descobre sobre ela, preenchido pelo
+    PageOutlineTreeprocessor: título, prévia, títulos e texto por seção."""
+
+    HEADINGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+    # só até h4 as seções viram documentos de busca
+    SECTION_LEVELS = 4
+
+    def __init__(self):
+        self.title: str | None = None
+        self.preview = ''
+        # nível do <h1>/<h2> que abre o documento, se houver (sai do corpo)
+        self.leading_heading: int | None = None
+        # (nível, âncora, título) de todos os títulos, na ordem do documento
+        self.headings: list[tuple[int, str, str]] = []
+        # [âncora, nível, título, [trechos de texto]]; a primeira é o texto
+        # anterior ao primeiro título
+        self.sections: list[list] = [['', 1, '', []]]
+        # ids e hrefs do documento, para a validação de links
+        self.ids: list[str] = []
+        self.links: list[str] = []
+
+
+class PageOutlineTreeprocessor(Treeprocessor):
+    """Percorre a árvore uma vez, depois do toc (que define os ids)."""
+
+    def run(self, root):
+        outline = self.md.page_outline = PageOutline()
+        children = list(root)
+        if children and children[0].tag in ('h1', 'h2'):
+            outline.leading_heading = int(children[0].tag[1])
+        self._walk(root, outline)
+        for element in root.iter():
+            if element.get('id'):
+                outline.ids.append(element.get('id'))
+            if element.tag == 'a' and element.get('href'):
+                outline.links.append(element.get('href'))
+        for raw in self.md.htmlStash.rawHtmlBlocks:
+            if isinstance(raw, str) and '<pre' not in raw:
+                for attr, value in _ATTR_RE.findall(raw):
+                    (outline.ids if attr == 'id' else outline.links).append(unescape(value))
+
+    def _text(self, text: str | None) -> str:
+        # trechos guardados no htmlStash (HTML bruto, entidades) aparecem como
+        # marcadores no texto; blocos de código ficam fora, como os <pre>
+        if not text:
+            return ''
+        # código inline chega à árvore já escapado (&lt;); o resto, literal
+        return unescape(markdown.util.HTML_PLACEHOLDER_RE.sub(self._stashed, text))
+
+    def _stashed(self, match: re.Match) -> str:
+        raw = self.md.htmlStash.rawHtmlBlocks[int(match.group(1))]
+        if not isinstance(raw, str) or '<pre' in raw:
+            return ''
+        return _TAG_RE.sub('', raw)
+
+    def _walk(self, element, outline: PageOutline):
+        for child in element:
+            if child.tag in outline.HEADINGS:
+                title = self._text(''.join(child.itertext())).strip()
+                level = int(child.tag[1])
+                anchor = child.get('id', '')
+                outline.headings.append((level, anchor, title))
+                if outline.title is None and level <= 2:
+                    outline.title = title
+                if level <= outline.SECTION_LEVELS:
+                    outline.sections.append([anchor, level, title, [title]])
+                else:
+                    outline.sections[-1][3].append(title)
+            elif child.tag == 'pre':
+                pass
+            else:
+                if child.tag == 'p' and not outline.preview:
+                    raw = ''.join(child.itertext()).strip()
+                    # um parágrafo só com o marcador é um bloco de HTML bruto
+                    text = '' if _PLACEHOLDER_ONLY_RE.fullmatch(raw) else self._text(raw)
+                    if text:
+                        outline.preview = escape(text[:150] + '...', quote=False)
+                outline.sections[-1][3].append(self._text(child.text))
+                self._walk(child, outline)
+            outline.sections[-1][3].append(self._text(child.tail))
+
+
+class PageOutlineExtension(markdown.Extension):
+    def extendMarkdown(self, md):
+        md.registerExtension(self)
+        self.md = md
+        md.page_outline = PageOutline()
+        # prioridade abaixo da do toc (5): os títulos já têm id
+        md.treeprocessors.register(PageOutlineTreeprocessor(md), 'page_outline', 4)
+
+    def reset(self):
+        self.md.page_outline = PageOutline()
+
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_ATTR_RE = re.compile(r"""\s(id|href)=["']([^"']*)["']""")
+_PLACEHOLDER_ONLY_RE = re.compile(markdown.util.HTML_PLACEHOLDER % r"[0-9]+")
+
+
+def converter_extensions() -> list:
+    # MD_EXTS mais a coleta do outline; o scripts/bench_build.py usa a mesma lista
+    return [*MD_EXTS, PageOutlineExtension()]
+
+
+# conversor reaproveitado entre páginas; cada processo do pool cria o seu
+_CONVERTER: markdown.Markdown | None = None
+
+
+def get_converter() -> markdown.Markdown:
+    global _CONVERTER
+    if _CONVERTER is None:
+        _CONVERTER = markdown.Markdown(extensions=converter_extensions())
+    return _CONVERTER
 
 
 def md_to_html(md_text: str) -> str:
-    return markdown(md_text, extensions=MD_EXTS)
+    # reset() limpa o estado por documento (toc, footnotes, etc.) sem
+    # reinstanciar as extensões
+    return get_converter().reset().convert(md_text)
 
 
-def extract_title(md_text: str, fallback: str) -> str:
-    # first H1 or H2
-    for line in md_text.splitlines():
-        if line.startswith('# '):
-            return line[2:].strip()
-        if line.startswith('## '):
-            return line[3:].strip()
-    return fallback
+# palavras frequentes demais para ajudar na busca
+STOPWORDS = frozenset("""
+    ao aos as com como da das de do dos em era essa esse esta este for isso mais
+    mas na nas no nos ou para pela pelo por que se sem ser sua seu um uma
+""".split())
 
 
-def build_page(md_path: Path, out_path: Path):
-    md_text = md_path.read_text(encoding='utf-8')
-    title = extract_title(md_text, md_path.stem.replace('-', ' '))
-    html_body = md_to_html(md_text)
-    
-    html = TEMPLATE.format(
+def fold_accents(text: str) -> str:
+    # "Análise" -> "analise"; o search.js aplica a mesma normalização
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in re.findall(r"[a-z0-9_]+", fold_accents(text)) if len(t) > 1 and t not in STOPWORDS]
+
+
+def extract_sections(outline: PageOutline, page_title: str) -> tuple:
+    sections = []
+    for i, (anchor, level, title, chunks) in enumerate(outline.sections):
+        text = ''.join(chunks)
+        if i == 0:
+            if not text.strip():
+                continue  # nenhum texto antes do primeiro título
+            title = page_title
+        terms = Counter(tokenize(text))
+        # termos do título pesam mais
+        for term in tokenize(title):
+            terms[term] += 5
+        if terms:
+            sections.append((anchor, level, title, dict(terms)))
+    return tuple(sections)
+
+
+def write_search_index(pages: list[tuple[str, str, dict]]) -> int:
+    """Grava o índice invertido em docs/assets/search-index.
+
+    `pages` traz (módulo, url relativa a docs/, dados de busca da página).
+    O arquivo index.json lista os documentos (uma seção de página cada) e
+    os shards; cada shard <letra>.json guarda os termos que começam com
+    aquela letra, já sem acentos, como {termo: [doc, peso, doc, peso, ...]}.
+    """
+    docs = []
+    shards: dict[str, dict[str, list[int]]] = {}
+    for module, url, data in pages:
+        for anchor, level, title, terms in data['sections']:
+            doc_id = len(docs)
+            docs.append([url + (f"#{anchor}" if anchor else ''), title, level, module, data['title']])
+            for term, weight in terms.items():
+                shards.setdefault(term[0], {}).setdefault(term, []).extend((doc_id, weight))
+
+    keep = {"index.json"} | {f"{key}.json" for key in shards}
+    for old in SEARCH_INDEX_DIR.glob('*.json'):
+        if old.name not in keep:
+            old.unlink()
+    for key, terms in shards.items():
+        payload = {term: terms[term] for term in sorted(terms)}
+        write_if_changed(SEARCH_INDEX_DIR / f"{key}.json",
+                         json.dumps(payload, ensure_ascii=False, separators=(',', ':')))
+    # o search.js descarta as mesmas palavras da consulta
+    index = {'version': 1, 'docs': docs, 'shards': sorted(shards), 'stopwords': sorted(STOPWORDS)}
+    write_if_changed(SEARCH_INDEX_DIR / "index.json",
+                     json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+    return len(docs)
+
+
+# links que saem do site (http:, mailto:, //cdn...) não são verificados
+_EXTERNAL_LINK_RE = re.compile(r"^(?:[a-z][a-z0-9+.-]*:|//)", re.IGNORECASE)
+# ids que o template e o pós-processamento acrescentam a toda página
+TEMPLATE_IDS = frozenset(re.findall(r"""\bid=["']([^"'{}]+)["']""",
+                                    TEMPLATE + add_dark_mode_footer.DARK_MODE_BUTTON))
+
+
+def _resolve_link(url: str, href: str) -> tuple[str, str]:
+    # (página de destino relativa a docs/, âncora) de um href da página `url`
+    path, _, fragment = href.partition('#')
+    path = unquote(path)
+    if not path:
+        return url, unquote(fragment)
+    target = posixpath.normpath(posixpath.join(posixpath.dirname(url), path))
+    if path.endswith('/') or (DOCS / target).is_dir():
+        target = posixpath.join(target, 'index.html')
+    return target, unquote(fragment)
+
+
+def validate_links(pages: list[tuple[str, str, dict]],
+                   modules: dict[str, list[str]]) -> tuple[int, list[str], list[str]]:
+    """Confere todos os links internos contra os ids coletados na conversão.
+
+    `pages` traz (url relativa a docs/, título, dados de page_anchors);
+    `modules`, a url de cada índice consolidado e as urls das suas lições.
+    Devolve (links verificados, links quebrados, âncoras duplicadas).
+    """
+    ids: dict[str, set[str]] = {}
+    by_url = {url: (title, data) for url, title, data in pages}
+    duplicated: list[str] = []
+    for url, title, data in pages:
+        ids[url] = set(data['ids']) | TEMPLATE_IDS
+        for anchor, count in Counter(data['ids']).items():
+            if count > 1:
+                duplicated.append(f"{url}: #{anchor} aparece {count} vezes")
+    for index_url, members in modules.items():
+        # no índice, cada lição vira uma seção com id slugify(título)
+        owners: dict[str, list[str]] = {}
+        for member in members:
+            title, data = by_url[member]
+            member_ids = [slugify(title)] + [i for i in data['ids'] if i != data['lead']]
+            for anchor in member_ids:
+                owners.setdefault(anchor, []).append(posixpath.basename(member))
+        ids[index_url] = set(owners) | TEMPLATE_IDS
+        for anchor, names in owners.items():
+            if len(names) > 1:
+                duplicated.append(f"{index_url}: #{anchor} repetido ({', '.join(sorted(set(names)))})")
+
+    checked = 0
+    broken: list[str] = []
+
+    def check(url: str, href: str, origin: str = ''):
+        nonlocal checked
+        checked += 1
+        target, fragment = _resolve_link(url, href)
+        problem = ''
+        if target.startswith('../'):
+            problem = "fora do site"
+        elif target in ids:
+            if fragment and fragment not in ids[target]:
+                problem = f"âncora #{fragment} não existe em {target}"
+        elif not (DOCS / target).is_file():
+            problem = "página não existe"
+            if target.endswith('.md') and target[:-3] + '.html' in ids:
+                problem += f" (use {posixpath.basename(target)[:-3]}.html)"
+        if problem:
+            broken.append(f"{url}{origin}: {href} → {problem}")
+
+    for url, title, data in pages:
+        for href in data['links']:
+            if href != '#' and not _EXTERNAL_LINK_RE.match(href):
+                check(url, href)
+    # no índice, só as âncoras locais mudam de sentido; os demais links
+    # resolvem igual ao da própria lição (mesma pasta)
+    for index_url, members in modules.items():
+        for member in members:
+            for href in by_url[member][1]['links']:
+                if href.startswith('#') and href != '#':
+                    check(index_url, href, f" (de {posixpath.basename(member)})")
+    return checked, broken, duplicated
+
+
+def _compress_one(path: Path) -> tuple[int, int, int | None, bool]:
+    """Atualiza path.gz (e path.br) se estiverem ausentes ou mais antigos que path.
+
+    Devolve (bytes originais, bytes gzip, bytes brotli, se regravou).
+    """
+    targets = [path.with_name(path.name + '.gz')]
+    if brotli is not None:
+        targets.append(path.with_name(path.name + '.br'))
+    mtime = path.stat().st_mtime_ns
+    stale = any(not t.exists() or t.stat().st_mtime_ns < mtime for t in targets)
+    if stale:
+        data = path.read_bytes()
+        # mtime=0 deixa o .gz idêntico entre builds com a mesma entrada
+        targets[0].write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            targets[1].write_bytes(brotli.compress(data, quality=11))
+    sizes = [t.stat().st_size for t in targets]
+    return path.stat().st_size, sizes[0], sizes[1] if brotli is not None else None, stale
+
+
+def compress_outputs(roots: list[Path], jobs: int = 1) -> str:
+    """Gera versões .gz/.br ao lado dos HTML/CSS/JS/JSON de `roots`.
+
+    Só recomprime arquivos alterados desde a última compressão (o build não
+    toca nas saídas idênticas) e remove as cópias cujo original sumiu, além
+    dos .br quando o brotli não está instalado (não seriam atualizados).
+    zlib e brotli liberam o GIL, então threads bastam para o paralelismo.
+    """
+    files: list[Path] = []
+    for root in roots:
+        for path in sorted(root.rglob('*')):
+            if path.suffix in ('.gz', '.br'):
+                if not path.with_suffix('').exists() or (path.suffix == '.br' and brotli is None):
+                    path.unlink()
+            elif path.suffix in COMPRESS_EXTS and path.is_file():
+                files.append(path)
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        results = list(pool.map(_compress_one, files))
+    raw = sum(r[0] for r in results)
+    gz = sum(r[1] for r in results)
+    updated = sum(r[3] for r in results)
+    report = (f"🗜 compressão: {updated} de {len(files)} arquivo(s) atualizado(s); "
+              f"{raw / 1e6:.2f} MB → gzip {gz / 1e6:.2f} MB ({gz / max(raw, 1):.0%})")
+    if brotli is not None:
+        br = sum(r[2] for r in results)
+        report += f", brotli {br / 1e6:.2f} MB ({br / max(raw, 1):.0%})"
+    else:
+        report += " (instale 'brotli' para gerar também os .br)"
+    return report
+
+
+def remove_stale_compressed(roots: list[Path]) -> int:
+    """Remove as cópias .gz/.br cujo original sumiu ou foi regravado depois delas.
+
+    Usado nos builds sem --compress: um servidor que entrega os arquivos
+    pré-comprimidos serviria a versão antiga da página.
+    """
+    removed = 0
+    for root in roots:
+        for path in root.rglob('*'):
+            if path.suffix not in ('.gz', '.br'):
+                continue
+            original = path.with_suffix('')
+            if not original.exists() or original.stat().st_mtime_ns > path.stat().st_mtime_ns:
+                path.unlink()
+                removed += 1
+    return removed
+
+
+class Profiler:
+    """Tempo e alocação de memória por etapa e por página (opção --profile).
+
+    Cada etapa vira um evento no formato "trace event" do Chrome
+    (chrome://tracing, Perfetto); summary() agrega os eventos por etapa.
+    Com memory=False só o tempo é medido, sem o custo do tracemalloc
+    (usado pelo scripts/bench_build.py).
+    """
+
+    def __init__(self, epoch: float | None = None, memory: bool = True):
+        # os processos do pool recebem o epoch do processo principal, para
+        # que todos os eventos fiquem na mesma linha do tempo
+        self.epoch = time.perf_counter() if epoch is None else epoch
+        self.memory = memory
+        self.events: list[dict] = []
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, page: Path | str):
+        current = 0
+        if self.memory:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            after, peak = tracemalloc.get_traced_memory() if self.memory else (0, 0)
+            self.events.append({
+                'name': name, 'cat': 'build', 'ph': 'X',
+                'ts': round((start - self.epoch) * 1e6, 1),
+                'dur': round((end - start) * 1e6, 1),
+                'pid': os.getpid(), 'tid': threading.get_ident(),
+                'args': {
+                    'page': Path(page).relative_to(ROOT).as_posix() if Path(page).is_absolute() else str(page),
+                    'alloc_bytes': after - current,
+                    'peak_bytes': peak - current,
+                },
+            })
+
+    def drain(self) -> list[dict]:
+        events, self.events = self.events, []
+        return events
+
+    def write_trace(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        trace = {'traceEvents': self.events, 'displayTimeUnit': 'ms'}
+        path.write_text(json.dumps(trace, ensure_ascii=False), encoding='utf-8')
+
+    def summary(self) -> str:
+        stages: dict[str, list[dict]] = {}
+        for event in self.events:
+            stages.setdefault(event['name'], []).append(event)
+        total = sum(e['dur'] for e in self.events) or 1
+        lines = [f"{'etapa':<20} {'chamadas':>8} {'total ms':>10} {'média ms':>9} {'máx ms':>9} "
+                 f"{'%':>6} {'alocado MB':>11} {'pico KB':>9}"]
+        for name, events in sorted(stages.items(), key=lambda item: -sum(e['dur'] for e in item[1])):
+            durations = [e['dur'] / 1000 for e in events]
+            lines.append(
+                f"{name:<20} {len(events):>8} {sum(durations):>10.1f} {sum(durations) / len(events):>9.2f} "
+                f"{max(durations):>9.2f} {sum(durations) * 1000 / total:>6.1%} "
+                f"{sum(e['args']['alloc_bytes'] for e in events) / 1e6:>11.2f} "
+                f"{max(e['args']['peak_bytes'] for e in events) / 1024:>9.0f}"
+            )
+        slowest = sorted(self.events, key=lambda e: -e['dur'])[:5]
+        lines.append("")
+        lines.append("Etapas mais lentas:")
+        lines.extend(f"  {e['dur'] / 1000:>8.2f} ms  {e['name']:<20} {e['args']['page']}" for e in slowest)
+        return "\n".join(lines)
+
+
+# None desliga a instrumentação (padrão)
+_PROFILER: Profiler | None = None
+_NOT_PROFILED = contextlib.nullcontext()
+
+
+def profile_stage(name: str, page: Path | str):
+    if _PROFILER is None:
+        return _NOT_PROFILED
+    return _PROFILER.stage(name, page)
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    """Resultado de uma única conversão de um .md, compartilhado entre a
+    página individual e o índice consolidado do módulo."""
+    title: str
+    html: str
+    # início, em `html`, do corpo usado no índice do módulo (sem o título da lição)
+    body_start: int
+    preview: str
+    # (âncora, nível, título, {termo: frequência}) por seção, para a busca
+    sections: tuple = ()
+    # (nível, âncora, título) de cada título da página
+    headings: tuple = ()
+    # ids e links internos ou externos do HTML da página
+    ids: tuple = ()
+    links: tuple = ()
+    # sha256 do .md convertido (o mesmo file_hash() do manifesto)
+    digest: str = ''
+
+    @property
+    def body(self) -> str:
+        return self.html[self.body_start:]
+
+
+# caminho do .md -> última conversão; cada edição substitui a entrada anterior
+_RENDER_CACHE: dict[Path, RenderedPage] = {}
+
+
+def render_markdown(md_path: Path, digest: str | None = None) -> RenderedPage:
+    """Converte o .md, reaproveitando a conversão anterior se o conteúdo
+    (sha256) não mudou. `digest`, quando o chamador já tem o hash, evita
+    reler o arquivo."""
+    page = _RENDER_CACHE.get(md_path)
+    if page is not None and digest is not None and page.digest == digest:
+        return page
+    with profile_stage('read', md_path):
+        data = md_path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+    if page is not None and page.digest == digest:
+        return page
+    md_text = data.decode('utf-8')
+    with profile_stage('md_to_html', md_path):
+        converter = get_converter().reset()
+        html_body = converter.convert(md_text)
+        outline = converter.page_outline
+    title = outline.title or md_path.stem.replace('-', ' ')
+    body_start = 0
+    if outline.leading_heading:
+        # o título da lição vira o <h2> da seção no índice do módulo
+        close = f"</h{outline.leading_heading}>"
+        body_start = html_body.find(close) + len(close)
+    with profile_stage('extract_sections', md_path):
+        sections = extract_sections(outline, title)
+    page = RenderedPage(title=title, html=html_body, body_start=body_start, preview=outline.preview,
+                        sections=sections, headings=tuple(outline.headings),
+                        ids=tuple(outline.ids), links=tuple(outline.links), digest=digest)
+    _RENDER_CACHE[md_path] = page
+    return page
+
+
+def seed_render_cache(md_path: Path, page: RenderedPage):
+    # usado pelo processo principal para reaproveitar conversões feitas no pool
+    _RENDER_CACHE[md_path] = page
+
+
+def page_anchors(page: RenderedPage) -> dict:
+    """Dados de links de uma página, guardados no manifesto."""
+    # o título que abre a lição não entra no índice do módulo
+    lead = page.headings[0][1] if page.headings and page.body_start else ''
+    return {'ids': list(page.ids), 'links': list(page.links), 'lead': lead}
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Grava `text` em `path` só se o conteúdo mudou; devolve True se gravou.
+
+    Manter o arquivo intocado preserva o mtime, o que evita reenvios no deploy
+    e recargas desnecessárias no modo --watch.
+    """
+    data = text.encode('utf-8')
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+def write_chunks_if_changed(path: Path, chunks) -> bool:
+    """Como write_if_changed, mas grava um iterável de trechos sem juntá-los.
+
+    O resultado vai para um arquivo temporário enquanto é calculado o hash;
+    se bater com o do arquivo existente, o temporário é descartado.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    digest = hashlib.sha256()
+    size = 0
+    with tmp.open('wb') as f:
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            digest.update(data)
+            size += len(data)
+            f.write(data)
+    try:
+        if path.stat().st_size == size:
+            old = hashlib.sha256()
+            with path.open('rb') as f:
+                for block in iter(partial(f.read, 1 << 16), b''):
+                    old.update(block)
+            if old.digest() == digest.digest():
+                tmp.unlink()
+                return False
+    except FileNotFoundError:
+        pass
+    os.replace(tmp, path)
+    return True
+
+
+def render_shell(title: str, out_path: Path) -> tuple[str, str]:
+    """Página pós-processada sem o conteúdo, dividida em (antes, depois)."""
+    html = postprocess(render_template(title, CONTENT_MARKER, out_path))
+    head, tail = html.split(CONTENT_MARKER)
+    return head, tail
+
+
+def render_template(title: str, content: str, out_path: Path) -> str:
+    # caminhos relativos à página, para que o site funcione em qualquer subdiretório
+    assets = Path(os.path.relpath(ASSETS, out_path.parent)).as_posix()
+    return TEMPLATE.format(
         title=title,
-        content=html_body,
-      assets=Path('../assets').as_posix(),
-      index=Path('../index.html').as_posix(),
+        content=content,
+        assets=assets,
+        page_css=ASSET_FILES['page.css'],
+        page_js=ASSET_FILES['page.js'],
+        progress_js=ASSET_FILES['progress.js'],
+        search_js=ASSET_FILES['search.js'],
+        quiz_js=ASSET_FILES['quiz.js'],
+        site_js=ASSET_FILES['site.js'],
+        index=Path(os.path.relpath(DOCS / 'index.html', out_path.parent)).as_posix(),
         repo=REPO_URL,
         site=SITE_URL,
-      date=datetime.now().strftime('%d/%m/%Y %H:%M'),
-      body_class="presentation"
+        body_class="presentation"
     )
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(html, encoding='utf-8')
-    print(f"✔ {md_path} → {out_path}")
 
 
-def strip_first_heading(html_text: str) -> str:
-    # remove the first <h1> or <h2> to avoid duplicated titles inside panels
-    pattern = re.compile(r"^\s*<h[12][^>]*>.*?</h[12]>", re.IGNORECASE | re.DOTALL)
-    return re.sub(pattern, "", html_text, count=1)
+def build_page(md_path: Path, out_path: Path, digest: str | None = None) -> str:
+    page = render_markdown(md_path, digest)
+    
+    with profile_stage('template', md_path):
+        html = render_template(escape(page.title, quote=False), page.html, out_path)
+    with profile_stage('postprocess', md_path):
+        html = postprocess(html)
+    with profile_stage('write', md_path):
+        written = write_if_changed(out_path, html)
+    if not written:
+        return f"= {md_path} (saída idêntica)"
+    return f"✔ {md_path} → {out_path}"
 
 
 def slugify(text: str) -> str:
@@ -852,50 +2014,41 @@ def slugify(text: str) -> str:
     return text or "sec"
 
 
-def build_module_index(module_dir: Path):
+def write_section_fragments(fragments_dir: Path, md_files: list[Path], digests: dict[Path, str]):
+  """Grava o corpo de cada lição em <módulo>/_sections/ e apaga fragmentos órfãos."""
+  names = set()
+  for md_path in md_files:
+    name = f"{md_path.stem}.html"
+    names.add(name)
+    write_if_changed(fragments_dir / name, postprocess_chunk(render_markdown(md_path, digests[md_path]).body))
+  for old in fragments_dir.glob('*.html'):
+    if old.name not in names:
+      old.unlink()
+
+
+def build_module_index(module_dir: Path, digests: dict[Path, str] | None = None) -> str | None:
   md_files = sorted(module_dir.glob('*.md'))
   if not md_files:
-    return
-  
-  # Build sections and collect TOC info
-  sections: list[str] = []
-  toc_items: list[dict] = []
+    return None
   
+  # O sumário vem antes das seções, então os títulos são lidos numa primeira
+  # passada; os corpos das lições só são buscados no cache na hora de gravar,
+  # uma seção por vez, sem montar a página inteira na memória.
+  toc_parts = ['<nav class="module-toc-summary"><h2>📚 Neste módulo</h2><ul class="toc-list">']
+  # hashes das lições, para que as buscas seguintes no cache não releiam os .md
+  digests = dict(digests or {})
   for md_path in md_files:
-    md_text = md_path.read_text(encoding='utf-8')
-    title = extract_title(md_text, md_path.stem.replace('-', ' '))
-    html_body = md_to_html(md_text)
-    html_body = strip_first_heading(html_body)
-    anchor = slugify(title)
-    
-    # Extract first paragraph as preview
-    preview_match = re.search(r'<p>(.*?)</p>', html_body, re.DOTALL)
-    preview = preview_match.group(1)[:150] + '...' if preview_match else ''
-    preview = re.sub(r'<[^>]+>', '', preview)  # Remove HTML tags
-    
-    toc_items.append({
-      'title': title,
-      'anchor': anchor,
-      'preview': preview,
-      'filename': md_path.stem
-    })
-    
-    sections.append(
-      f"<section class=\"module-section\" id=\"{anchor}\"><h2>{title}</h2>{html_body}</section>"
-    )
-
-  # Build TOC HTML
-  toc_html = '<nav class="module-toc-summary"><h2>📚 Neste módulo</h2><ul class="toc-list">'
-  for item in toc_items:
-    toc_html += f'''
+    page = render_markdown(md_path, digests.get(md_path))
+    digests[md_path] = page.digest
+    toc_parts.append(f'''
     <li class="toc-item">
-      <a href="#{item['anchor']}" class="toc-link">
-        <strong>{item['title']}</strong>
-        <span class="toc-preview">{item['preview']}</span>
+      <a href="#{slugify(page.title)}" class="toc-link">
+        <strong>{escape(page.title, quote=False)}</strong>
+        <span class="toc-preview">{page.preview}</span>
       </a>
     </li>
-    '''
-  toc_html += '</ul></nav>'
+    ''')
+  toc_parts.append('</ul></nav>')
 
   hero_html = ""
   if module_dir.name == "0-Fundamentos":
@@ -925,51 +2078,525 @@ def build_module_index(module_dir: Path):
       "</ul>"
       "</section>"
     )
-  content = "<div class=\"module-content\">" + hero_html + toc_html + "\n" + "\n".join(sections) + "</div>"
-
   title = module_dir.name.replace('-', ' ') + " — Módulo completo"
   out_path = OUT / module_dir.name / "index.html"
-  out_path.parent.mkdir(parents=True, exist_ok=True)
-  html = TEMPLATE.format(
-    title=title,
-    content=content,
-    assets=Path('../assets').as_posix(),
-    index=Path('../index.html').as_posix(),
-    repo=REPO_URL,
-    site=SITE_URL,
-    date=datetime.now().strftime('%d/%m/%Y %H:%M'),
-    body_class="presentation"
-  )
-  out_path.write_text(html, encoding='utf-8')
-  print(f"★ módulo {module_dir.name} → {out_path}")
-
-
-def build_all():
+  fragments_dir = out_path.parent / SECTIONS_DIR
+  if LAZY_SECTIONS:
+    with profile_stage('fragments', out_path):
+      write_section_fragments(fragments_dir, md_files, digests)
+  elif fragments_dir.exists():
+    shutil.rmtree(fragments_dir)
+
+  def section(md_path: Path) -> str:
+    page = render_markdown(md_path, digests[md_path])
+    anchor = slugify(page.title)
+    title = escape(page.title, quote=False)
+    if not LAZY_SECTIONS:
+      return f"<section class=\"module-section\" id=\"{anchor}\"><h2>{title}</h2>{page.body}</section>"
+    # só o título e a prévia; o corpo vem de _sections/ ao se aproximar da tela
+    return (
+      f"<section class=\"module-section\" id=\"{anchor}\" data-fragment=\"{SECTIONS_DIR}/{md_path.stem}.html\">"
+      f"<h2>{title}</h2><div class=\"section-body\"><p class=\"section-placeholder\">{page.preview} "
+      f"<a href=\"{md_path.stem}.html\">Abrir a lição completa →</a></p></div></section>"
+    )
+
+  def content():
+    yield "<div class=\"module-content\">" + hero_html
+    yield from toc_parts
+    yield "\n"
+    for i, md_path in enumerate(md_files):
+      yield ("\n" if i else "") + section(md_path)
+    yield "</div>"
+
+  with profile_stage('template', out_path):
+    head, tail = render_shell(title, out_path)
+  with profile_stage('write', out_path):
+    chunks = itertools.chain([head], map(postprocess_chunk, content()), [tail])
+    written = write_chunks_if_changed(out_path, chunks)
+  if not written:
+    return f"= módulo {module_dir.name} (saída idêntica)"
+  return f"★ módulo {module_dir.name} → {out_path}"
+
+
+def set_root(root: Path, modules: list[str] | None = None):
+  """Aponta o gerador para outra árvore de módulos (usado pelos benchmarks)."""
+  global ROOT, DOCS, OUT, ASSETS, CACHE_DIR, MANIFEST_PATH, HIGHLIGHT_CACHE_DIR, SEARCH_INDEX_DIR
+  global MODULES, _HIGHLIGHT_CACHE
+  ROOT = root
+  DOCS = ROOT / "docs"
+  OUT = DOCS / "html"
+  ASSETS = DOCS / "assets"
+  CACHE_DIR = ROOT / ".build-cache"
+  MANIFEST_PATH = CACHE_DIR / "manifest.json"
+  HIGHLIGHT_CACHE_DIR = CACHE_DIR / "highlight"
+  SEARCH_INDEX_DIR = ASSETS / "search-index"
+  if modules is not None:
+    MODULES = list(modules)
+  if _HIGHLIGHT_CACHE is not None:
+    _HIGHLIGHT_CACHE = HighlightCache(HIGHLIGHT_CACHE_DIR, _HIGHLIGHT_CACHE.max_bytes)
+  if MINIFY:
+    # os assets minificados são lidos do docs/assets da nova raiz
+    set_minify(True)
+
+
+def _init_worker(highlight_cache: HighlightCache | None, root: Path, modules: list[str],
+                 profile_epoch: float | None, minify: bool = False, profile_memory: bool = True):
+  # repassa aos processos do pool a configuração definida na linha de comando
+  global _HIGHLIGHT_CACHE, _PROFILER
+  if root != ROOT:
+    set_root(root, modules)
+  if minify != MINIFY:
+    set_minify(minify)
+  _HIGHLIGHT_CACHE = highlight_cache
+  _PROFILER = Profiler(profile_epoch, profile_memory) if profile_epoch is not None else None
+
+
+def _render_task(task: tuple) -> tuple[RenderedPage, str | None, list[dict]]:
+  # executado nos processos do pool: precisa ser uma função de módulo
+  kind, md_path, out_path, digest = task
+  log = build_page(md_path, out_path, digest) if kind == 'page' else None
+  events = _PROFILER.drain() if _PROFILER is not None else []
+  return render_markdown(md_path, digest), log, events
+
+
+def run_tasks(tasks: list[tuple], jobs: int = 1) -> list[str | None]:
+  """Converte os .md das tarefas (gravando as páginas de tipo 'page') e
+  devolve os logs na mesma ordem de `tasks`.
+
+  Cada conversão fica no cache de renderização do processo principal, para
+  que os índices de módulo não convertam o mesmo arquivo de novo.
+  """
+  if jobs <= 1 or len(tasks) <= 1:
+    results = [_render_task(task) for task in tasks]
+  else:
+    epoch = _PROFILER.epoch if _PROFILER is not None else None
+    memory = _PROFILER.memory if _PROFILER is not None else True
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(_HIGHLIGHT_CACHE, ROOT, MODULES, epoch, MINIFY, memory)) as pool:
+      results = list(pool.map(_render_task, tasks))
+    for task, (page, _, _) in zip(tasks, results):
+      seed_render_cache(task[1], page)
+  if _PROFILER is not None:
+    for _, _, events in results:
+      _PROFILER.events.extend(events)
+  return [log for _, log, _ in results]
+
+
+def global_inputs() -> list[str]:
+  """Arquivos (relativos a ROOT) dos quais todas as páginas dependem."""
+  inputs = ['scripts/build_site.py', 'add_dark_mode_footer.py', 'remove_old_footer.py', 'fix_encoding.py']
+  if MINIFY:
+    # minificados, os scripts entram no HTML pelo nome com fingerprint
+    inputs += [(ASSETS / name).relative_to(ROOT).as_posix() for name in SOURCE_ASSETS]
+  return inputs
+
+
+def dependency_graph() -> dict[str, set[Path]]:
+  """Mapa entrada (relativa a ROOT) -> arquivos gerados que dependem dela.
+
+  lição -> sua página e, se estiver na raiz do módulo, o índice consolidado;
+  template, assets e pós-processamento -> todas as páginas. A página inicial
+  (docs/index.html) é mantida à mão e fica fora do grafo.
+  """
+  graph: dict[str, set[Path]] = {}
+  everything: set[Path] = set()
+  for module in MODULES:
+    mod_dir = ROOT / module
+    if not mod_dir.exists():
+      continue
+    for md in sorted(mod_dir.glob('**/*.md')):
+      rel = md.relative_to(ROOT)
+      outputs = {OUT / rel.with_suffix('.html')}
+      if md.parent == mod_dir:
+        outputs.add(OUT / module / "index.html")
+      graph[rel.as_posix()] = outputs
+      everything |= outputs
+  for source in global_inputs():
+    graph[source] = everything
+  return graph
+
+
+def normalize_changed(path: str) -> str:
+  """Entrada do --changed (./x, absoluta, com '\\') relativa a ROOT, como o git lista."""
+  path = path.strip().replace('\\', '/')
+  try:
+    return (ROOT / path).resolve().relative_to(ROOT.resolve()).as_posix()
+  except ValueError:
+    return path  # fora da árvore do site: não casa com nenhuma entrada do grafo
+
+
+def rebuild_targets(changed: list[str]) -> set[Path]:
+  """Conjunto mínimo de saídas a regenerar para a lista de arquivos alterados."""
+  graph = dependency_graph()
+  targets: set[Path] = set()
+  changed = [normalize_changed(path) for path in changed]
+  for rel in changed:
+    if rel in graph:
+      targets |= graph[rel]
+      continue
+    parts = rel.split('/')
+    # lição removida: some da página consolidada do módulo
+    if rel.endswith('.md') and len(parts) == 2 and parts[0] in MODULES:
+      targets.add(OUT / parts[0] / "index.html")
+  if 'scripts/build_site.py' in changed:
+    print("ℹ docs/index.html é mantido à mão: confira os links se a lista MODULES mudou")
+  return targets
+
+
+def changed_since(rev: str) -> list[str]:
+  """Arquivos alterados desde `rev` (inclui os ainda não versionados)."""
+  diff = subprocess.run(['git', 'diff', '--name-only', rev], cwd=ROOT,
+                        capture_output=True, text=True, check=True).stdout
+  untracked = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard'], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+  return sorted(set(diff.splitlines()) | set(untracked.splitlines()))
+
+
+def build_all(incremental: bool = False, jobs: int = 1, compress: bool = False,
+              changed: list[str] | None = None):
   ensure_dirs()
+  # o manifesto é sempre regravado, para que o próximo build incremental
+  # possa partir de um build completo
+  manifest = (BuildManifest.load(MANIFEST_PATH) if incremental or changed is not None
+              else BuildManifest(MANIFEST_PATH))
+  targets = None
+  if changed is not None:
+    if manifest.signature_changed():
+      # ex.: --minify ou --lazy-sections alternados; as páginas fora da lista
+      # apontariam para assets que write_page_assets() acabou de remover
+      print("ℹ template, assets ou opções mudaram desde o último build: regenerando tudo")
+      manifest = BuildManifest(MANIFEST_PATH)
+    else:
+      targets = rebuild_targets(changed)
+      print(f"🧭 {len(changed)} arquivo(s) alterado(s) → {len(targets)} saída(s) a regenerar")
+
+  def up_to_date(out_path: Path, sources: dict[str, str]) -> bool:
+    # as saídas da lista sempre são regeneradas; as demais, só se estiverem
+    # em dia no manifesto (fontes, assinatura e arquivo existente)
+    if targets is not None:
+      return out_path not in targets and manifest.is_fresh(out_path, sources)
+    return incremental and manifest.is_fresh(out_path, sources)
+  tasks: list[tuple] = []
+  modules: list[Path] = []
+  pending: list[tuple[Path, dict[str, str], Path | None]] = []
+  pages: list[tuple[str, Path, Path]] = []
+  # índice consolidado -> páginas das lições que ele reúne
+  module_members: dict[Path, list[Path]] = {}
+  # .md -> sha256, também a chave do cache de renderização
+  digests: dict[Path, str] = {}
+  skipped = 0
   for module in MODULES:
     mod_dir = ROOT / module
     if not mod_dir.exists():
       continue
-    for md in mod_dir.glob('**/*.md'):
+    hashes: dict[str, str] = {}
+    for md in sorted(mod_dir.glob('**/*.md')):
       rel = md.relative_to(ROOT)
+      hashes[rel.as_posix()] = digests[md] = file_hash(md)
       out_rel = Path(rel).with_suffix('.html')
       out_path = OUT / out_rel
-      build_page(md, out_path)
-    # também gera uma página consolidada do módulo
-    build_module_index(mod_dir)
+      sources = {rel.as_posix(): hashes[rel.as_posix()]}
+      pages.append((module, md, out_path))
+      if up_to_date(out_path, sources):
+        skipped += 1
+        continue
+      tasks.append(('page', md, out_path, digests[md]))
+      pending.append((out_path, sources, md))
+    # também gera uma página consolidada do módulo, apenas se algum dos
+    # .md do próprio módulo mudou (ou se a lista de lições mudou)
+    members = sorted(mod_dir.glob('*.md'))
+    index_sources = {md.relative_to(ROOT).as_posix(): hashes[md.relative_to(ROOT).as_posix()] for md in members}
+    index_path = OUT / module / "index.html"
+    if not index_sources:
+      continue
+    module_members[index_path] = [OUT / md.relative_to(ROOT).with_suffix('.html') for md in members]
+    if up_to_date(index_path, index_sources):
+      skipped += 1
+      continue
+    # lições cuja página está em dia ainda precisam ser convertidas para o índice
+    queued = {task[1] for task in tasks}
+    tasks.extend(('render', md, None, digests[md]) for md in members if md not in queued)
+    modules.append(mod_dir)
+    pending.append((index_path, index_sources, None))
+
+  # lições removidas (no --watch) não ficam ocupando o cache
+  for md in _RENDER_CACHE.keys() - digests.keys():
+    del _RENDER_CACHE[md]
+  logs = run_tasks(tasks, jobs)
+  # os índices só montam HTML já convertido (via cache), no processo principal
+  logs.extend(build_module_index(mod_dir, digests) for mod_dir in modules)
+  unchanged = 0
+  for log in logs:
+    if log:
+      print(log)
+      unchanged += log.startswith('=')
+  for out_path, sources, md in pending:
+    if md is None:
+      manifest.record(out_path, sources)
+    else:
+      page = render_markdown(md, digests[md])
+      manifest.record(out_path, sources, search={'title': page.title, 'sections': page.sections},
+                      anchors=page_anchors(page))
+  manifest.save()
+
+  # o índice de busca cobre todas as páginas; as que não mudaram vêm do manifesto
+  search_pages = [
+    (module, out_path.relative_to(DOCS).as_posix(), manifest.get(out_path)['search'])
+    for module, md, out_path in pages
+  ]
+  with profile_stage('search_index', SEARCH_INDEX_DIR):
+    doc_count = write_search_index(search_pages)
+  print(f"🔍 índice de busca: {doc_count} seções → {SEARCH_INDEX_DIR.relative_to(ROOT)}")
+
+  # links e âncoras: tudo vem do manifesto, coletado durante a conversão
+  link_pages = [
+    (out_path.relative_to(DOCS).as_posix(), manifest.get(out_path)['search']['title'],
+     manifest.get(out_path)['anchors'])
+    for module, md, out_path in pages
+  ]
+  checked, broken, duplicated = validate_links(link_pages, {
+    index_path.relative_to(DOCS).as_posix(): [out.relative_to(DOCS).as_posix() for out in outs]
+    for index_path, outs in module_members.items()
+  })
+  print(f"🔗 links: {checked} verificado(s), {len(broken)} quebrado(s), "
+        f"{len(duplicated)} âncora(s) duplicada(s)")
+  for problem in broken + duplicated:
+    print(f"  ✗ {problem}")
+  if compress:
+    print(compress_outputs([OUT, ASSETS], jobs))
+  else:
+    removed = remove_stale_compressed([OUT, ASSETS])
+    if removed:
+      print(f"🗜 {removed} cópia(s) .gz/.br desatualizada(s) removida(s)")
+  if _HIGHLIGHT_CACHE is not None:
+    _HIGHLIGHT_CACHE.prune()
+  print(f"Concluído: {len(pending) - unchanged} gravado(s), {unchanged} idêntico(s), "
+        f"{skipped} sem alteração")
+  return len(broken)
+
+
+class LiveReload:
+    """Contador de versões do site; cada rebuild acorda os navegadores conectados."""
+
+    def __init__(self):
+        self.version = 0
+        self.cond = threading.Condition()
+
+    def notify(self):
+        with self.cond:
+            self.version += 1
+            self.cond.notify_all()
+
+    def wait(self, seen: int, timeout: float) -> int:
+        with self.cond:
+            self.cond.wait_for(lambda: self.version != seen, timeout)
+            return self.version
+
+
+LIVE_RELOAD_SCRIPT = (
+    "<script>new EventSource('/__livereload').onmessage = () => location.reload();</script>"
+)
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Serve docs/ e injeta nas páginas o script de recarga automática."""
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/__livereload':
+            self._event_stream()
+            return
+        file_path = Path(self.translate_path(path))
+        if file_path.is_dir() and path.endswith('/'):
+            file_path = file_path / 'index.html'
+        if file_path.suffix != '.html' or not file_path.is_file():
+            super().do_GET()
+            return
+        html = file_path.read_text(encoding='utf-8')
+        if '</body>' in html:
+            html = html.replace('</body>', LIVE_RELOAD_SCRIPT + '</body>', 1)
+        else:
+            html += LIVE_RELOAD_SCRIPT
+        body = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _event_stream(self):
+        live_reload: LiveReload = self.server.live_reload
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        seen = live_reload.version
+        try:
+            while True:
+                version = live_reload.wait(seen, timeout=15)
+                # sem mudança, um comentário mantém a conexão aberta
+                self.wfile.write(b'data: reload\n\n' if version != seen else b': ping\n\n')
+                self.wfile.flush()
+                seen = version
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _is_generated_asset(path: Path) -> bool:
+    # cópias com fingerprint (page.*, scripts minificados) e versões .gz/.br
+    if path.suffix in ('.gz', '.br'):
+        return True
+    stem, _, ext = path.name.partition('.')
+    return (f"{stem}.css" in ASSET_FILES or f"{stem}.js" in ASSET_FILES) and \
+        re.fullmatch(r"[0-9a-f]{10}\.(css|js)", ext) is not None
+
+
+def watch_snapshot() -> dict[Path, tuple[int, int]]:
+    """(mtime, tamanho) dos .md dos módulos e dos assets escritos à mão."""
+    paths: list[Path] = []
+    for module in MODULES:
+        paths.extend((ROOT / module).glob('**/*.md'))
+    paths.extend(p for p in ASSETS.glob('*') if p.is_file() and not _is_generated_asset(p))
+    snapshot = {}
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            continue  # removido entre o glob e o stat
+        snapshot[path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def watch(port: int = 8000, jobs: int = 1, interval: float = 0.3):
+    """Reconstrói o que mudou a cada edição e recarrega o navegador.
+
+    Usa polling (sem dependências extras) sobre os .md dos MODULES e os
+    arquivos de docs/assets; o build incremental cuida de regenerar só a
+    página alterada e o índice do seu módulo.
+    """
+    build_all(incremental=True, jobs=jobs)
+    live_reload = LiveReload()
+    handler = partial(DevRequestHandler, directory=str(DOCS))
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.live_reload = live_reload
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    first = MODULES[0]
+    print(f"👀 Observando alterações — http://127.0.0.1:{port}/html/{first}/index.html (Ctrl+C para sair)")
+
+    before = watch_snapshot()
+    try:
+        while True:
+            time.sleep(interval)
+            now = watch_snapshot()
+            if now == before:
+                continue
+            changed = sorted(p for p in before.keys() | now.keys() if before.get(p) != now.get(p))
+            before = now
+            start = time.perf_counter()
+            # com --minify, os scripts de docs/assets entram nas páginas como
+            # cópias minificadas com fingerprint: é preciso regerá-las
+            assets_changed = MINIFY and any(p.parent == ASSETS and p.name in SOURCE_ASSETS for p in changed)
+            if assets_changed:
+                set_minify(MINIFY)
+            if assets_changed or any(p.suffix == '.md' for p in changed):
+                try:
+                    build_all(incremental=True, jobs=jobs,
+                              changed=[p.relative_to(ROOT).as_posix() for p in changed])
+                except Exception as e:
+                    # um .md com erro não deve derrubar o watch
+                    print(f"❌ Erro no build: {e}")
+                    continue
+            live_reload.notify()
+            names = ', '.join(p.relative_to(ROOT).as_posix() for p in changed)
+            print(f"🔄 {names} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
 
 
 if __name__ == '__main__':
   # Modo de uso:
-  #   python build_site.py            -> gera tudo (páginas e índices por módulo)
-  #   python build_site.py 0-Fundamentos -> gera apenas o índice consolidado desse módulo
-  if len(sys.argv) > 1:
-    target = sys.argv[1]
+  #   python build_site.py                 -> gera tudo (páginas e índices por módulo)
+  #   python build_site.py --incremental   -> regenera apenas o que mudou desde o último build
+  #   python build_site.py --jobs 4        -> distribui a conversão entre 4 processos (0 = todos os núcleos)
+  #   python build_site.py --since origin/main -> regenera só o que depende dos arquivos alterados
+  #   git diff --name-only | python build_site.py --changed -   (idem, com a lista explícita)
+  #   python build_site.py --lazy-sections -> índices de módulo carregam as lições sob demanda
+  #   python build_site.py --strict-links  -> termina com erro se houver links internos quebrados
+  #   python build_site.py --minify        -> HTML, CSS e JS minificados (blocos de código intactos)
+  #   python build_site.py --compress      -> grava também cópias .gz/.br das páginas e assets
+  #   python build_site.py --profile       -> tempo/memória por etapa e trace do Chrome
+  #   python build_site.py --watch         -> servidor local com recarga automática a cada edição
+  #   python build_site.py 0-Fundamentos   -> gera apenas o índice consolidado desse módulo
+  parser = argparse.ArgumentParser(description="Gera o site HTML a partir dos módulos em Markdown.")
+  parser.add_argument('module', nargs='?', help="gera apenas o índice consolidado deste módulo")
+  parser.add_argument('--incremental', action='store_true',
+                      help=f"pula páginas cujas entradas não mudaram (manifesto em {MANIFEST_PATH.relative_to(ROOT)})")
+  parser.add_argument('--jobs', '-j', type=int, default=1,
+                      help="número de processos para gerar as páginas (0 = número de núcleos)")
+  parser.add_argument('--no-highlight-cache', action='store_true',
+                      help=f"não usa o cache de blocos de código em {HIGHLIGHT_CACHE_DIR.relative_to(ROOT)}")
+  parser.add_argument('--changed', type=argparse.FileType('r', encoding='utf-8'), metavar='ARQUIVO',
+                      help="lista de arquivos alterados, um por linha ('-' = entrada padrão); "
+                           "regenera apenas as saídas que dependem deles")
+  parser.add_argument('--since', metavar='REV',
+                      help="como --changed, usando 'git diff --name-only REV' e os arquivos não versionados")
+  parser.add_argument('--lazy-sections', action='store_true',
+                      help=f"nos índices de módulo, grava o corpo de cada lição em <módulo>/{SECTIONS_DIR}/ "
+                           "e o carrega ao rolar a página (sem JavaScript, fica um link para a lição)")
+  parser.add_argument('--strict-links', action='store_true',
+                      help="sai com código 1 se a validação encontrar links internos quebrados (útil na CI)")
+  parser.add_argument('--minify', action='store_true',
+                      help="colapsa espaços fora de <pre>/<code>, remove regras CSS sobrescritas e "
+                           "minifica os assets (o template passa a usar cópias com fingerprint)")
+  parser.add_argument('--compress', action='store_true',
+                      help="grava versões .gz (e .br, se o pacote brotli estiver instalado) "
+                           "dos HTML/CSS/JS/JSON gerados, para servidores que as entregam diretamente")
+  parser.add_argument('--watch', action='store_true',
+                      help="observa os módulos e docs/assets, reconstrói o que mudou e serve docs/ com recarga automática")
+  parser.add_argument('--port', type=int, default=8000, help="porta do servidor do --watch (padrão: 8000)")
+  parser.add_argument('--profile', nargs='?', type=Path, const=CACHE_DIR / "profile-trace.json", metavar='TRACE',
+                      help="mede tempo e memória de cada etapa por página (o tracemalloc deixa o build "
+                           "mais lento); grava um trace do Chrome "
+                           f"(padrão: {(CACHE_DIR / 'profile-trace.json').relative_to(ROOT)})")
+  args = parser.parse_args()
+  jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+  if args.no_highlight_cache:
+    _HIGHLIGHT_CACHE = None
+  if args.minify:
+    set_minify(True)
+  LAZY_SECTIONS = args.lazy_sections
+  if args.profile:
+    _PROFILER = Profiler()
+  if args.module:
+    target = args.module
     mod_dir = (ROOT / target) if not target.startswith(str(ROOT)) else Path(target)
     if not mod_dir.exists() or not mod_dir.is_dir():
       print(f"Módulo não encontrado: {mod_dir}")
       sys.exit(1)
     ensure_dirs()
-    build_module_index(mod_dir)
+    log = build_module_index(mod_dir)
+    if log:
+      print(log)
+  elif args.watch:
+    watch(port=args.port, jobs=jobs)
   else:
-    build_all()
+    changed = None
+    if args.since:
+      changed = changed_since(args.since)
+    elif args.changed:
+      changed = [line.strip() for line in args.changed if line.strip()]
+    broken = build_all(incremental=args.incremental, jobs=jobs, compress=args.compress, changed=changed)
+    if args.strict_links and broken:
+      sys.exit(1)
+  if _PROFILER is not None:
+    print()
+    print(_PROFILER.summary())
+    _PROFILER.write_trace(args.profile)
+    print(f"Trace (chrome://tracing ou ui.perfetto.dev): {args.profile}")